@@ -0,0 +1,112 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compares list endpoint queries: ORM entities used before versus Core projections used now.
+Seeds apps and events of one app in a transaction on the configured database, and rolls it back at the end.
+Run from repository root: python -m benchmarks.bench_list_queries [apps] [events]
+"""
+
+import sys
+import timeit
+from contextlib import contextmanager
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, raiseload
+from metadata.api.app.response import AppDTO
+from metadata.api.app.service import AppService
+from metadata.api.event.request import CreateOrUpdateEventDTO
+from metadata.api.event.response import PublicEventViewDTO
+from metadata.api.event.service import EventService
+from metadata.core.database import connection, orm
+from metadata.core.domain.app import App, AppId, Organization, Timezone
+from metadata.core.domain.event import Event
+from metadata.core.domain.schema import Schema
+from metadata.core.domain.status import Status
+
+
+def orm_listed_apps(session_factory):
+    with session_factory() as session:
+        apps = session.scalars(select(App).options(raiseload('*')).where(App.status != Status.NOT_READY)).unique().all()
+        return [AppDTO(app.id.value, app.api_key, app.timezone.name, app.created_at.date(), app.close_event_partitions_after_hours)
+                for app in apps]
+
+
+def orm_event_views(session_factory, app_id: AppId):
+    with session_factory() as session:
+        events = session.scalars(select(Event).options(joinedload(Event.schema).raiseload(Schema.parameters), raiseload('*'))
+                                 .join(orm.schema_table, Event.schema_id == orm.schema_table.c.id)
+                                 .where(Event.app_id == app_id)
+                                 .order_by(orm.schema_table.c.name)).unique().all()
+        return [PublicEventViewDTO(e.schema.name, e.schema.get_alias(), e.schema.description, e.datasource_id) for e in events]
+
+
+def letters(number: int) -> str:
+    # app ids can have only lowercase letters
+    return ''.join(chr(ord('a') + number // 26 ** i % 26) for i in reversed(range(4)))
+
+
+def seed(session_factory, app_count: int, event_count: int) -> AppId:
+    with session_factory() as session:
+        organization = Organization(name='bench', gcp_project_id='bench')
+        apps = [App(id=AppId(f'bench{letters(i)}'), organization=organization, timezone=Timezone('UTC')) for i in range(app_count)]
+        for app in apps:
+            app.set_status(Status.SUCCESS)
+        session.add_all(apps)
+        session.commit()
+
+    app_id = apps[0].id
+    event_service = EventService(session_factory)
+    for i in range(event_count):
+        event_service.create_or_update_event(app_id, CreateOrUpdateEventDTO(name=f'bench_event_{i:05}'))
+    return app_id
+
+
+def main():
+    args = [int(arg) for arg in sys.argv[1:]]
+    app_count, event_count = args + [1000, 500][len(args):]
+    orm.init_orm_mappers()
+
+    with connection.engine.connect() as conn:
+        transaction = conn.begin()
+
+        @contextmanager
+        def session_factory():
+            # sessions join the outer transaction, their commits are rolled back with it
+            session = Session(bind=conn, autoflush=False, expire_on_commit=False)
+            try:
+                yield session
+            finally:
+                session.close()
+
+        try:
+            app_id = seed(session_factory, app_count, event_count)
+            app_service, event_service = AppService(session_factory), EventService(session_factory)
+            core_apps = app_service.get_listed_apps()
+            assert sorted(core_apps, key=lambda app: app.app_id) == sorted(orm_listed_apps(session_factory), key=lambda app: app.app_id)
+            assert event_service.get_all_event_views(app_id).events == orm_event_views(session_factory, app_id)
+
+            print(f'{len(core_apps)} apps, {event_count} events')
+            for name, query in [
+                ('apps, ORM entities', lambda: orm_listed_apps(session_factory)),
+                ('apps, Core projection', lambda: app_service.get_listed_apps()),
+                ('events, ORM entities', lambda: orm_event_views(session_factory, app_id)),
+                ('events, Core projection', lambda: event_service.get_all_event_views(app_id).events),
+            ]:
+                seconds = min(timeit.repeat(query, number=10, repeat=3)) / 10
+                print(f'{name:32} {seconds * 1000:8.1f} ms')
+        finally:
+            transaction.rollback()
+
+
+if __name__ == '__main__':
+    main()
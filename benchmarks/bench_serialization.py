@@ -0,0 +1,87 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares serialization of a synthetic fleet config: FastAPI encoder used before versus orjson used by snapshots.
+Run from repository root: python -m benchmarks.bench_serialization [apps] [events per app] [parameters per event]
+"""
+
+import sys
+import timeit
+from datetime import date
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+import orjson
+from metadata.api.app.response import AllAppsConfigDTO, AppConfigDTO, CommonConfigsDTO, DatasourceDTO, SchemaDTO, SchemaParameterDTO
+
+
+def schema(vendor: str, name: str, parameter_count: int) -> SchemaDTO:
+    return SchemaDTO(
+        vendor=vendor,
+        url=f'iglu:{vendor}/{name}/jsonschema/1-0-3',
+        type='object',
+        name=name,
+        alias=name,
+        version='1-0-3',
+        description=f'Description of {name}',
+        parameters=[SchemaParameterDTO(name=f'param_{i}', alias=f'param_{i}', type='string', description=f'Description of param_{i}')
+                    for i in range(parameter_count)]
+    )
+
+
+def fleet(app_count: int, event_count: int, parameter_count: int) -> AllAppsConfigDTO:
+    contexts = {f'ctx_{i}': schema('com.algebraai.gametuner.embedded_context', f'ctx_{i}', parameter_count) for i in range(10)}
+    common_configs = CommonConfigsDTO(
+        atomic_fields={f'atomic_{i}': 'string' for i in range(40)},
+        gdpr_event_parameters=[],
+        gdpr_context_parameters={name: ['param_0'] for name in contexts},
+        gdpr_atomic_parameters=['atomic_0'],
+        close_event_partition_after_hours=4,
+        context_schemas=contexts,
+        non_embedded_context_schemas={},
+        embedded_context_schemas=contexts,
+    )
+    app_id_configs = {}
+    for a in range(app_count):
+        app_id = f'app{a}'
+        app_id_configs[app_id] = AppConfigDTO(
+            gdpr_event_parameters={f'event_{e}': ['param_0'] for e in range(event_count)},
+            timezone='UTC',
+            created=date(2023, 1, 1),
+            datasources={'default': DatasourceDTO(id='default', has_data_from=date(2023, 1, 1), has_data_up_to=date(2024, 1, 1), materialized_columns=[])},
+            event_schemas={f'event_{e}': schema(f'com.algebraai.gametuner.{app_id}', f'event_{e}', parameter_count) for e in range(event_count)},
+            external_services=[],
+            events_backfill_jobs=[],
+        )
+    return AllAppsConfigDTO(common_configs=common_configs, app_id_configs=app_id_configs)
+
+
+def main():
+    args = [int(arg) for arg in sys.argv[1:]]
+    app_count, event_count, parameter_count = args + [50, 100, 20][len(args):]
+    config = fleet(app_count, event_count, parameter_count)
+    assert orjson.loads(orjson.dumps(config)) == orjson.loads(JSONResponse(jsonable_encoder(config)).body)
+
+    print(f'{app_count} apps, {event_count} events per app, {parameter_count} parameters per event, '
+          f'{len(orjson.dumps(config)) / 1024 / 1024:.1f} MiB')
+    for name, serialize in [
+        ('jsonable_encoder + JSONResponse', lambda: JSONResponse(jsonable_encoder(config)).body),
+        ('orjson', lambda: orjson.dumps(config, default=jsonable_encoder)),
+    ]:
+        seconds = min(timeit.repeat(serialize, number=1, repeat=3))
+        print(f'{name:32} {seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from datetime import date
+from threading import Event, Lock, Thread
+from typing import Callable, ContextManager, Dict, List, Tuple
+from fastapi.logger import logger
+from sqlalchemy.orm import Session
+from metadata.api.app.request import DatasourceFreshnessDTO
+from metadata.api.app.service import AppService
+from metadata.core.domain.common import EntityError, EntityNotFound
+
+
+class FreshnessBuffer:
+    """
+    Write-behind buffer of datasource freshness updates. Only the latest date of a datasource matters,
+    so updates are coalesced per datasource and written together by flush.
+    """
+
+    def __init__(self, db_session: Callable[[], ContextManager[Session]]):
+        self._app_service = AppService(db_session)
+        self._lock = Lock()
+        # one flush at a time, so a flush never races with another one writing the same datasources
+        self._flush_lock = Lock()
+        self._pending: Dict[Tuple[str, str], date] = {}
+
+    def add(self, app_id: str, datasource_id: str, has_data_up_to: date):
+        with self._lock:
+            self._add((app_id, datasource_id), has_data_up_to)
+
+    def _add(self, key: Tuple[str, str], has_data_up_to: date):
+        pending = self._pending.get(key)
+        self._pending[key] = max(pending, has_data_up_to) if pending else has_data_up_to
+
+    def flush(self):
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        updates = [DatasourceFreshnessDTO(app_id, datasource_id, has_data_up_to) for (app_id, datasource_id), has_data_up_to in pending.items()]
+        try:
+            self._app_service.update_datasources_freshness(updates)
+        except (EntityError, EntityNotFound):
+            # one invalid update must not drop the others
+            failed = []
+            for update in updates:
+                try:
+                    self._app_service.update_datasources_freshness([update])
+                except (EntityError, EntityNotFound):
+                    logger.exception(f'Dropping freshness update of {update.app_id}/{update.datasource_id}')
+                except:
+                    logger.exception(f'Failed to write freshness update of {update.app_id}/{update.datasource_id}, keeping it')
+                    failed.append(update)
+            self._keep(failed)
+        except:
+            self._keep(updates)
+            raise
+
+    def _keep(self, updates: List[DatasourceFreshnessDTO]):
+        # kept for next flush, newer dates that arrived meanwhile win
+        with self._lock:
+            for update in updates:
+                self._add((update.app_id, update.datasource_id), update.has_data_up_to)
+
+
+_buffer: FreshnessBuffer | None = None
+_stopping = Event()
+_flusher_thread: Thread | None = None
+
+
+def add(app_id: str, datasource_id: str, has_data_up_to: date) -> bool:
+    """
+    Buffers freshness update if write-behind buffer is started. Returns False when update has to be written right away.
+    """
+    if _buffer is None:
+        return False
+    _buffer.add(app_id, datasource_id, has_data_up_to)
+    return True
+
+
+def flush():
+    if _buffer is not None:
+        _buffer.flush()
+
+
+def _run_flusher(buffer: FreshnessBuffer, flush_interval_seconds: float):
+    while not _stopping.wait(flush_interval_seconds):
+        try:
+            buffer.flush()
+        except:
+            logger.exception('Failed to flush datasource freshness updates')
+
+
+def start(db_session: Callable[[], ContextManager[Session]], flush_interval_seconds: float):
+    global _buffer, _flusher_thread
+    _stopping.clear()
+    _buffer = FreshnessBuffer(db_session)
+    _flusher_thread = Thread(target=_run_flusher, args=(_buffer, flush_interval_seconds), name='freshness-flusher')
+    _flusher_thread.daemon = True
+    _flusher_thread.start()
+
+
+def stop():
+    """
+    Stops periodic flushing, waiting for a flush in progress, and writes what is left in the buffer.
+    """
+    if _flusher_thread is not None:
+        _stopping.set()
+        _flusher_thread.join()
+    flush()
@@ -58,4 +58,18 @@ class EventsByApp:
         return gdpr_event_parameters
 
     def get_gdpr_atomic_parameter_names(self) -> List[str]:
-        return [a.name for a in self.atomic_parameters if a.is_gdpr]
\ No newline at end of file
+        return [a.name for a in self.atomic_parameters if a.is_gdpr]
+
+
+@dataclass(frozen=True)
+class FleetConfig:
+    apps: List[App]
+    events_by_app: EventsByApp
+
+
+@dataclass(frozen=True)
+class ConfigChanges:
+    generation: int
+    apps: List[App]
+    events_by_app: EventsByApp
+    catalog_changed: bool
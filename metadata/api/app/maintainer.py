@@ -19,12 +19,14 @@ from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 from fastapi.logger import logger
 from metadata.core.domain.app import App
-from metadata.core.domain.event import AtomicParameter, CommonEvent, Event, EventContext
+from metadata.core.domain.event import CommonEvent, Event, EventContext
 from metadata.core.domain.status import Status
 from metadata.api.app.internal import bigquery_all_apps, bigquery_single_app
 from metadata.core.event_tables_creator import BigQueryEventTablesCreator
 from metadata.core.gcs_iglu_uploader import GcsIgluUploader
-from metadata.core.database import utils
+from metadata.core.database import orm, utils
+from metadata.core.database import config_notifications
+from metadata.core.system_catalog import get_system_catalog
 
 
 class AppMaintainer:
@@ -36,7 +38,9 @@ class AppMaintainer:
 
         with self.db_session() as session:
             utils.maintainer_lock(session)
-            apps: List[App] = session.scalars(select(App).where(App.status != Status.SUCCESS)).unique().all()
+            # ids first, so an idle pass only reads the partial index and full app graphs are loaded only for matched apps
+            ids = session.scalars(select(orm.app_table.c.id).where(utils.not_success(orm.app_table.c.status))).all()
+            apps: List[App] = session.scalars(select(App).where(orm.app_table.c.id.in_(ids))).unique().all() if ids else []
             logger.info(f"Got {len(apps)} apps to process")
             if apps:
                 if not self.dry_run:
@@ -47,9 +51,10 @@ class AppMaintainer:
                     bigquery_client = bigquery.Client(credentials=credentials)
                     bigquery_all_apps.process(bigquery_client, bigquery_region)
 
-                event_contexts: List[EventContext] = session.scalars(select(EventContext)).unique().all()
-                atomic_parameters = session.scalars(select(AtomicParameter)).all()
-                common_events: List[CommonEvent] = session.scalars(select(CommonEvent)).unique().all()
+                catalog = get_system_catalog(self.db_session)
+                event_contexts: List[EventContext] = catalog.event_contexts
+                atomic_parameters = catalog.atomic_parameters
+                common_events: List[CommonEvent] = catalog.common_events
                 for idx, app in enumerate(apps):
                     app: App
                     logger.info(f"Processing app {app.id} [{idx + 1} / {len(apps)}]")
@@ -58,7 +63,7 @@ class AppMaintainer:
                         bigquery_single_app.process(bigquery_client, bigquery_region, app)
                         self._process_event_contexts(event_tables_creator, iglu_uploader, event_contexts, atomic_parameters, app)
                     app.set_status(Status.SUCCESS)
-                    session.commit()
+                    config_notifications.commit_config_change(session)
             logger.info("Processed apps")
 
     def _process_event_contexts(self, event_tables_creator, iglu_uploader, event_contexts, atomic_parameters, app):
@@ -73,7 +78,8 @@ class AppMaintainer:
         for common_event in common_events:
             if common_event.id in app_common_events:
                 continue
-            common_event: CommonEvent
+            # catalog entities are shared, new event references a copy that belongs to this session
+            common_event: CommonEvent = session.merge(common_event, load=False)
             schema = common_event.get_app_schema(app.event_vendor)
             session.add(schema)
             event = Event(
@@ -22,4 +22,10 @@ class CreateAppDTO:
     app_id: str
     organization_name: str
     timezone: Timezone = Timezone("UTC")
-    has_data_from: date = None
\ No newline at end of file
+    has_data_from: date = None
+
+@dataclass(frozen=True)
+class DatasourceFreshnessDTO:
+    app_id: str
+    datasource_id: str
+    has_data_up_to: date
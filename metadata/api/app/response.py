@@ -12,15 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, fields
 from datetime import date
 from typing import Dict, List
-from metadata.api.app.internal.domain import EventsByApp
+from metadata.api.app.internal.domain import ConfigChanges, EventsByApp
 from metadata.core.domain.app import App, Datasource
 from metadata.core.domain.schema import Schema, SchemaParameter
 from metadata.core.domain.user_history import MaterializedColumn
 
 
+def _fields(entity) -> Dict:
+    # shallow, unlike dataclasses.asdict which deep copies, and without ORM attributes that are not dataclass fields
+    return {f.name: getattr(entity, f.name) for f in fields(entity)}
+
+
 @dataclass(frozen=True)
 class AppDTO:
     app_id: str
@@ -126,7 +131,7 @@ class MaterializedColumnDTO:
             totals=materialized_column.totals,
             can_filter=materialized_column.can_filter,
             can_group_by=materialized_column.can_group_by,
-            materialized_from=materialized_column.materialized_from,
+            materialized_from=materialized_column.materialized_from.date(),
             hidden=materialized_column.hidden
         )
 
@@ -164,22 +169,22 @@ class AppConfigDTO:
         if app.appsflyer_integration:
             external_services.append({
                 'service_name': 'apps_flyer',
-                'service_params': asdict(app.appsflyer_integration) | {'app_id': app.appsflyer_integration.app_id.value}
+                'service_params': _fields(app.appsflyer_integration) | {'app_id': app.appsflyer_integration.app_id.value}
             })
         if app.appsflyer_cost_etl_integration:
             external_services.append({
                 'service_name': 'apps_flyer_cost_etl',
-                'service_params': asdict(app.appsflyer_cost_etl_integration)| {'app_id': app.appsflyer_integration.app_id.value}
+                'service_params': _fields(app.appsflyer_cost_etl_integration) | {'app_id': app.appsflyer_integration.app_id.value}
             })
         if app.store_itunes:
             external_services.append({
                 'service_name': 'store_itunes',
-                'service_params': asdict(app.store_itunes)| {'app_id': app.store_itunes.app_id.value}
+                'service_params': _fields(app.store_itunes) | {'app_id': app.store_itunes.app_id.value}
             })
         if app.store_google_play:
             external_services.append({
                 'service_name': 'store_google_play',
-                'service_params': asdict(app.store_google_play)| {'app_id': app.store_google_play.app_id.value}
+                'service_params': _fields(app.store_google_play) | {'app_id': app.store_google_play.app_id.value}
             })
 
         return AppConfigDTO(
@@ -190,7 +195,7 @@ class AppConfigDTO:
             event_schemas={e.get_schema().name: SchemaDTO.from_domain_model(e.get_schema(), e.schema.get_alias(), e.get_schema().parameters)
                             for e in events_by_app.get_events(app.id)},
             external_services=external_services,
-            events_backfill_jobs=app.event_backfill_jobs,
+            events_backfill_jobs=[_fields(job) for job in app.event_backfill_jobs],
         )
 
 
@@ -205,3 +210,41 @@ class AllAppsConfigDTO:
             common_configs=CommonConfigsDTO.from_domain_model(events_by_app),
             app_id_configs={app.id.value: AppConfigDTO.from_domain_model(app, events_by_app) for app in app_list}
         )
+
+
+@dataclass(frozen=True)
+class SingleAppConfigDTO:
+    common_configs: CommonConfigsDTO
+    app_config: AppConfigDTO
+
+    @classmethod
+    def from_domain_model(cls, app: App, events_by_app: EventsByApp) -> 'SingleAppConfigDTO':
+        return cls(
+            common_configs=CommonConfigsDTO.from_domain_model(events_by_app),
+            app_config=AppConfigDTO.from_domain_model(app, events_by_app)
+        )
+
+
+@dataclass(frozen=True)
+class AllAppsConfigChangesDTO:
+    """
+    Changes of AllAppsConfigDTO since some generation. Changed apps come with their complete config,
+    and common configs are present only if they changed, so clients replace matching entries of their copy.
+    """
+    generation: int
+    common_configs: CommonConfigsDTO | None
+    app_id_configs: Dict[str, AppConfigDTO]
+
+    @classmethod
+    def from_domain_model(cls, changes: ConfigChanges) -> 'AllAppsConfigChangesDTO':
+        return cls(
+            generation=changes.generation,
+            common_configs=CommonConfigsDTO.from_domain_model(changes.events_by_app) if changes.catalog_changed else None,
+            app_id_configs={app.id.value: AppConfigDTO.from_domain_model(app, changes.events_by_app) for app in changes.apps}
+        )
+
+
+@dataclass(frozen=True)
+class ConfigWatchDTO:
+    etag: str
+    changed: bool
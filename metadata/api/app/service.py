@@ -14,23 +14,49 @@
 
 from collections import defaultdict
 from datetime import date
-from typing import Callable, ContextManager, List
-from sqlalchemy import select
+from typing import AsyncContextManager, Callable, ContextManager, List
+from sqlalchemy import String, and_, any_, bindparam, exists, func, or_, select, union
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import IntegrityError
-from metadata.api.app.internal.domain import EventsByApp
-from metadata.api.app.request import CreateAppDTO
-from metadata.core.domain.app import App, AppId, Datasource, Organization
+from sqlalchemy.ext.asyncio import AsyncSession
+from metadata.api.app.internal.domain import ConfigChanges, EventsByApp, FleetConfig
+from metadata.api.app.request import CreateAppDTO, DatasourceFreshnessDTO
+from metadata.api.app.response import AppDTO
+from metadata.core.database import config_notifications
+from metadata.core.domain.app import CLOSE_EVENT_PARTITIONS_AFTER_HOURS, App, AppId, Datasource, Organization
 from metadata.core.domain.common import EntityError, EntityNotFound
-from metadata.core.domain.event import AtomicParameter, Event, EventContext
+from metadata.core.domain.event import Event
 from metadata.core.domain.status import Status
+from metadata.core.database import loading, orm
+from metadata.core.system_catalog import SystemCatalog, get_system_catalog, get_system_catalog_async
 
 
+# rows per freshness upsert statement, each row takes 4 bind parameters and pg8000 allows at most 32767 of them
+FRESHNESS_UPSERT_CHUNK_SIZE = 5000
+
+# tables holding app configuration, other than events
+APP_CONFIG_TABLES = [
+    orm.appsflyer_integration_table,
+    orm.appsflyer_cost_etl_integration_table,
+    orm.event_backfill_job_table,
+    orm.datasource_table,
+    orm.store_itunes_table,
+    orm.store_google_play_table,
+    orm.user_history_materialized_column,
+]
+
 
 class AppService:
-    def __init__(self, db_session: Callable[[], ContextManager[Session]]):
+    def __init__(self, db_session: Callable[[], ContextManager[Session]],
+                 read_db_session: Callable[[], ContextManager[Session]] | None = None,
+                 async_read_db_session: Callable[[], AsyncContextManager[AsyncSession]] | None = None):
         self.db_session = db_session
+        # pure reads that may be served by read replica
+        self.read_db_session = read_db_session or db_session
+        # pure reads on the event loop, needed only by async methods
+        self.async_read_db_session = async_read_db_session
 
     def register(self, request: CreateAppDTO) -> App:
         with self.db_session() as session:
@@ -39,19 +65,64 @@ class AppService:
             session.add(app)
 
             try:
-                session.commit()
+                config_notifications.commit_config_change(session)
             except IntegrityError as exc:
                 raise EntityError() from exc
         return app
 
-    def get_all_success(self) -> List[App]:
-        with self.db_session() as session:
-            return session.scalars(select(App).where(App.status != Status.NOT_READY)).unique().all()
+    def get_listed_apps(self, after: str | None = None, limit: int | None = None, status: Status | None = None,
+                        prefix: str | None = None) -> List[AppDTO]:
+        """
+        Apps that are not NOT_READY ordered by app id, read as plain columns straight into response DTOs.
+        Page starts after given app id and has at most limit apps.
+        """
+        with self.read_db_session() as session:
+            return [self._app_dto(row) for row in session.execute(self._listed_apps_query(after, limit, status, prefix))]
 
-    def get_by_app_id(self, app_id: AppId) -> App:
-        with self.db_session() as session:
+    async def get_listed_apps_async(self, after: str | None = None, limit: int | None = None, status: Status | None = None,
+                                    prefix: str | None = None) -> List[AppDTO]:
+        """
+        Same as get_listed_apps, read through async session without holding a thread.
+        """
+        async with self.async_read_db_session() as session:
+            result = await session.execute(self._listed_apps_query(after, limit, status, prefix))
+            return [self._app_dto(row) for row in result]
+
+    @staticmethod
+    def _listed_apps_query(after: str | None, limit: int | None, status: Status | None, prefix: str | None):
+        app = orm.app_table
+        query = select(app.c.id, app.c.api_key, app.c.timezone, app.c.created_at)\
+            .where(app.c.status != Status.NOT_READY.value)
+        # ordered even when not paged, so rendered listing and its ETag depend only on content
+        query = query.order_by(app.c.id)
+        if status:
+            query = query.where(app.c.status == status.value)
+        if prefix:
+            query = query.where(app.c.id.startswith(prefix, autoescape=True))
+        if after:
+            query = query.where(app.c.id > after)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    @staticmethod
+    def _app_dto(row) -> AppDTO:
+        return AppDTO(
+            app_id=row.id,
+            api_key=row.api_key,
+            timezone=row.timezone,
+            # app listing always truncated created_at to a date
+            created_at=row.created_at.date(),
+            close_event_partitions_after_hours=CLOSE_EVENT_PARTITIONS_AFTER_HOURS
+        )
+
+    def get_minimal_by_app_id(self, app_id: AppId) -> App:
+        """
+        App without any related entities loaded.
+        """
+        with self.read_db_session() as session:
             try:
-                return session.scalars(select(App).where(App.id == app_id)).unique().one()
+                return session.scalars(select(App).options(*loading.app_minimal()).where(App.id == app_id)).unique().one()
             except NoResultFound as exc:
                 raise EntityNotFound() from exc
 
@@ -66,33 +137,183 @@ class AppService:
             if not datasource:
                 datasource = Datasource(id=datasource_id, app_id=app.id, has_data_from=has_data_up_to, has_data_up_to=has_data_up_to)
                 app.add_datasource(datasource)
+            elif datasource.has_data_up_to and datasource.has_data_up_to >= has_data_up_to:
+                # repeated ping leaves config as it is
+                return app
             else:
                 datasource.update_data_freshness(has_data_up_to)
-            session.commit()
+            config_notifications.commit_config_change(session)
         return app
 
-    def get_all_success_events_by_app(self) -> EventsByApp:
+    def update_datasources_freshness(self, updates: List[DatasourceFreshnessDTO]) -> int:
+        """
+        Same as update_datasource_freshness for many datasources, applied in one transaction with chunked upserts without loading apps.
+        Freshness only moves forward, so only the latest date given for each datasource counts.
+        Returns number of datasources created or moved forward.
+        """
+        if not updates:
+            return 0
+        latest = {}
+        for update in updates:
+            key = (update.app_id, update.datasource_id)
+            latest[key] = max(latest.get(key, update.has_data_up_to), update.has_data_up_to)
+
+        # same row order in every batch, so concurrent batches do not deadlock
+        rows = [{'app_id': app_id, 'id': datasource_id, 'has_data_from': has_data_up_to, 'has_data_up_to': has_data_up_to}
+                for (app_id, datasource_id), has_data_up_to in sorted(latest.items())]
         with self.db_session() as session:
-            apps: List[App] = session.scalars(select(App).where(App.status == Status.SUCCESS)).unique().all()
-            app_ids = {app.id: app for app in apps}
-            events: List[Event] = [e for e in session.scalars(select(Event)\
-                # filter by app ids to avoid race condition where some app became success in the mean time
-                .where(Event.status != Status.NOT_READY)).unique().all() if e.app_id in app_ids]
-            atomic_parameters: List[AtomicParameter] = session.scalars(select(AtomicParameter)).all()
-            event_contexts: List[EventContext] = session.scalars(select(EventContext).where(EventContext.embedded_in_event == False)).unique().all()
-            non_embedded_event_contexts: List[EventContext] = session.scalars(select(EventContext).where(EventContext.embedded_in_event == False)).unique().all()
-            embedded_event_contexts: List[EventContext] = session.scalars(select(EventContext).where(EventContext.embedded_in_event == True)).unique().all()
+            app_ids = sorted({app_id for app_id, _ in latest})
+            # single array parameter, however many apps there are
+            existing_app_ids = session.scalars(select(orm.app_table.c.id).where(
+                orm.app_table.c.id == any_(bindparam('app_ids', app_ids, type_=postgresql.ARRAY(String)))))
+            missing_app_ids = set(app_ids) - set(existing_app_ids)
+            if missing_app_ids:
+                raise EntityNotFound(f'Apps not found: {", ".join(sorted(missing_app_ids))}')
+
+            # chunks keep each statement under driver limit of bind parameters, all in the same transaction
+            changed = sum(session.execute(self._freshness_upsert(rows[start:start + FRESHNESS_UPSERT_CHUNK_SIZE])).rowcount
+                          for start in range(0, len(rows), FRESHNESS_UPSERT_CHUNK_SIZE))
+            # unchanged datasources leave config as it is
+            if not changed:
+                return 0
+            config_notifications.commit_config_change(session)
+        return changed
+
+    @staticmethod
+    def _freshness_upsert(rows: List[dict]):
+        datasource = orm.datasource_table
+        insert = postgresql.insert(datasource).values(rows)
+        return insert.on_conflict_do_update(
+            index_elements=[datasource.c.id, datasource.c.app_id],
+            set_={'has_data_up_to': insert.excluded.has_data_up_to},
+            where=or_(datasource.c.has_data_up_to.is_(None), datasource.c.has_data_up_to < insert.excluded.has_data_up_to),
+        )
+
+    def get_fleet_config(self) -> FleetConfig:
+        """
+        Apps that are not NOT_READY with everything needed to render their config, and events of SUCCESS apps.
+        Everything is read from a single snapshot, with a fixed number of queries regardless of number of apps and events.
+        """
+        # loaded before the session, so a catalog build never needs a second connection while this one is held
+        catalog = get_system_catalog(self.read_db_session)
+        with self.read_db_session() as session:
+            session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+            apps: List[App] = session.scalars(self._fleet_apps_query()).unique().all()
+            events: List[Event] = session.scalars(self._fleet_events_query()).unique().all()
+            return self._fleet_config(apps, events, catalog)
+
+    async def get_fleet_config_async(self) -> FleetConfig:
+        """
+        Same as get_fleet_config, read through async session without holding a thread.
+        """
+        catalog = await get_system_catalog_async(self.read_db_session)
+        async with self.async_read_db_session() as session:
+            await session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+            apps: List[App] = (await session.scalars(self._fleet_apps_query())).unique().all()
+            events: List[Event] = (await session.scalars(self._fleet_events_query())).unique().all()
+            return self._fleet_config(apps, events, catalog)
+
+    @staticmethod
+    def _fleet_apps_query():
+        # fixed order, so rendered config and its ETag depend only on content
+        return select(App).options(*loading.app_fleet_config())\
+            .where(App.status != Status.NOT_READY).order_by(orm.app_table.c.id)
+
+    @staticmethod
+    def _fleet_events_query():
+        return select(Event).options(*loading.event_detail())\
+            .join(orm.app_table, orm.event_table.c.app_id == orm.app_table.c.id)\
+            .where(and_(orm.app_table.c.status == Status.SUCCESS.value, Event.status != Status.NOT_READY))\
+            .order_by(orm.event_table.c.id)
+
+    def _fleet_config(self, apps: List[App], events: List[Event], catalog: SystemCatalog) -> FleetConfig:
+        success_apps = [app for app in apps if app.status == Status.SUCCESS]
+        return FleetConfig(apps=apps, events_by_app=self._events_by_app(success_apps, events, catalog))
+
+    def get_success_events_of_app(self, app_id: AppId) -> EventsByApp:
+        """
+        Same as get_fleet_config, but loads only single app and its events.
+        App must not be NOT_READY, and its events are returned only once app is SUCCESS.
+        """
+        catalog = get_system_catalog(self.read_db_session)
+        with self.read_db_session() as session:
+            try:
+                app: App = session.scalars(select(App).options(*loading.app_fleet_config())
+                                           .where(and_(App.id == app_id, App.status != Status.NOT_READY))).unique().one()
+            except NoResultFound as exc:
+                raise EntityNotFound() from exc
+
+            events: List[Event] = []
+            if app.status == Status.SUCCESS:
+                events = session.scalars(select(Event).options(*loading.event_detail())
+                                         .where(and_(Event.app_id == app_id, Event.status != Status.NOT_READY))
+                                         .order_by(orm.event_table.c.id)).unique().all()
+            return self._events_by_app([app], events, catalog)
+
+    def get_config_changes_since(self, since: int) -> ConfigChanges:
+        """
+        Returns apps whose config changed after revision `since`, and whether common configs changed.
+        Apps are selected like in get_fleet_config. Deleted rows are not tracked.
+        """
+        catalog = get_system_catalog(self.read_db_session)
+        with self.read_db_session() as session:
+            # generation and changes must come from the same snapshot
+            session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+            generation = session.scalar(select(func.greatest(*[select(func.max(table.c.revision)).scalar_subquery()
+                                                               for table in orm.CONFIG_REVISION_TABLES]))) or 0
+            if since >= generation:
+                return ConfigChanges(generation=generation, apps=[], events_by_app=EventsByApp([], [], [], [], {}, {}), catalog_changed=False)
+
+            changed_schema_ids = union(
+                select(orm.schema_table.c.id).where(orm.schema_table.c.revision > since),
+                select(orm.schema_parameter_table.c.schema_id).where(orm.schema_parameter_table.c.revision > since),
+            )
+            event, common_event = orm.event_table, orm.common_event_table
+            changed_app_ids = union(
+                select(orm.app_table.c.id).where(orm.app_table.c.revision > since),
+                *[select(table.c.app_id).where(table.c.revision > since) for table in APP_CONFIG_TABLES],
+                select(event.c.app_id)
+                    .select_from(event.outerjoin(common_event, event.c.parent_common_event_id == common_event.c.id))
+                    .where(or_(event.c.revision > since,
+                               event.c.schema_id.in_(changed_schema_ids),
+                               common_event.c.schema_id.in_(changed_schema_ids))),
+            )
+            apps: List[App] = session.scalars(select(App).options(*loading.app_fleet_config()).where(and_(
+                orm.app_table.c.id.in_(changed_app_ids),
+                App.status != Status.NOT_READY
+            ))).unique().all()
+
+            success_apps = [app for app in apps if app.status == Status.SUCCESS]
+            events: List[Event] = []
+            if success_apps:
+                events = session.scalars(select(Event).options(*loading.event_detail()).where(and_(
+                    event.c.app_id.in_([app.id.value for app in success_apps]),
+                    Event.status != Status.NOT_READY
+                ))).unique().all()
 
+            catalog_changed = session.scalar(select(or_(
+                exists().where(orm.atomic_parameter_table.c.revision > since),
+                exists().where(orm.event_context_table.c.revision > since),
+                exists().where(orm.event_context_table.c.schema_id.in_(changed_schema_ids)),
+            )))
+            return ConfigChanges(
+                generation=generation,
+                apps=apps,
+                events_by_app=self._events_by_app(success_apps, events, catalog),
+                catalog_changed=catalog_changed
+            )
 
+    def _events_by_app(self, apps: List[App], events: List[Event], catalog: SystemCatalog) -> EventsByApp:
         events_by_app_id = defaultdict(list)
         for event in events:
             events_by_app_id[event.app_id].append(event)
 
         return EventsByApp(
-            atomic_parameters=atomic_parameters,
-            event_contexts=event_contexts,
-            non_embedded_event_contexts=non_embedded_event_contexts,
-            embedded_event_contexts=embedded_event_contexts,
+            atomic_parameters=catalog.atomic_parameters,
+            # config always listed only non embedded contexts as event contexts
+            event_contexts=catalog.non_embedded_event_contexts,
+            non_embedded_event_contexts=catalog.non_embedded_event_contexts,
+            embedded_event_contexts=catalog.embedded_event_contexts,
             events_by_app=events_by_app_id,
-            apps_by_id=app_ids
+            apps_by_id={app.id: app for app in apps}
         )
@@ -12,18 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 from datetime import date
 from typing import List
-from fastapi import APIRouter, Depends
-from metadata.api.app.request import CreateAppDTO
-from metadata.api.app.response import AllAppsConfigDTO, AppDTO
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from metadata.api.app.request import CreateAppDTO, DatasourceFreshnessDTO
+from metadata.api.app.response import AllAppsConfigChangesDTO, AllAppsConfigDTO, AppDTO, ConfigWatchDTO, SingleAppConfigDTO
 from metadata.core.domain.app import AppId
+from metadata.core.domain.status import Status
 from metadata.api.app.service import AppService
+from metadata.api.app import freshness_buffer
+from metadata.api.snapshot import current_snapshot_async, etag_matches, snapshot_response_async
+from metadata.core.config_cache import config_generation
 from metadata.logging.router import LoggingRoute
 from metadata import dependencies
 
 router = APIRouter(route_class=LoggingRoute, tags=["app"])
 
+WATCH_MAX_TIMEOUT_SECONDS = 60
+MAX_PAGE_SIZE = 1000
+
 
 @router.post("/api/v1/apps")
 def register(request: CreateAppDTO, session_factory = Depends(dependencies.session_factory)):
@@ -31,26 +40,122 @@ def register(request: CreateAppDTO, session_factory = Depends(dependencies.sessi
     return app.api_key
 
 
-@router.get("/api/v1/apps")
-def apps(session_factory = Depends(dependencies.session_factory)) -> List[AppDTO]:
-    app_configs = AppService(session_factory).get_all_success()
-    return [AppDTO.from_domain_model(app_config) for app_config in app_configs]
+@router.get("/api/v1/apps", response_model=List[AppDTO])
+async def apps(request: Request, response: Response, after: str | None = None, limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+               status: Status | None = None, prefix: str | None = None, session_factory = Depends(dependencies.session_factory),
+               read_session_factory = Depends(dependencies.read_session_factory),
+               replica_session_factory = Depends(dependencies.replica_session_factory),
+               async_session_factory = Depends(dependencies.async_session_factory)):
+    """
+    Lists all apps, or a page of them when filtered or limited. Id of the last app of a full page is returned
+    in X-Next-Cursor header and is passed as after to get the next page.
+    """
+    if after or limit or status or prefix:
+        if async_session_factory:
+            app_list = await AppService(session_factory, async_read_db_session=async_session_factory).get_listed_apps_async(after, limit, status, prefix)
+        else:
+            app_list = await run_in_threadpool(AppService(session_factory, replica_session_factory).get_listed_apps, after, limit, status, prefix)
+        if limit and len(app_list) == limit:
+            response.headers['X-Next-Cursor'] = app_list[-1].app_id
+        return app_list
+
+    def build():
+        return AppService(session_factory, read_session_factory).get_listed_apps()
+
+    async def async_build():
+        return await AppService(session_factory, read_session_factory, async_session_factory).get_listed_apps_async()
+    return await snapshot_response_async(request, 'apps', build, revalidate_in_background=True, persist=True,
+                                         async_build=async_build if async_session_factory else None)
 
 
 @router.get("/api/v1/apps/{app_id}")
-def app_by_id(app_id: str, session_factory = Depends(dependencies.session_factory)):
-    app_config = AppService(session_factory).get_by_app_id(AppId(app_id))
-    return AppDTO.from_domain_model(app_config)
+async def app_by_id(request: Request, app_id: str, session_factory = Depends(dependencies.session_factory),
+                    read_session_factory = Depends(dependencies.read_session_factory)):
+    app_id = AppId(app_id)
+    def build():
+        return AppDTO.from_domain_model(AppService(session_factory, read_session_factory).get_minimal_by_app_id(app_id))
+    return await snapshot_response_async(request, f'apps/{app_id.value}', build)
+
+
+def _build_apps_detailed(session_factory, read_session_factory):
+    def build():
+        fleet_config = AppService(session_factory, read_session_factory).get_fleet_config()
+        return AllAppsConfigDTO.from_domain_model(fleet_config.apps, fleet_config.events_by_app)
+    return build
+
+
+def _build_apps_detailed_async(session_factory, read_session_factory, async_session_factory):
+    if not async_session_factory:
+        return None
+
+    async def build():
+        fleet_config = await AppService(session_factory, read_session_factory, async_session_factory).get_fleet_config_async()
+        # mapping whole fleet to DTOs would block the event loop
+        return await run_in_threadpool(AllAppsConfigDTO.from_domain_model, fleet_config.apps, fleet_config.events_by_app)
+    return build
+
+
+@router.get("/api/v1/apps-detailed", response_model=AllAppsConfigDTO)
+async def apps_detailed(request: Request, session_factory = Depends(dependencies.session_factory),
+                        read_session_factory = Depends(dependencies.read_session_factory),
+                        async_session_factory = Depends(dependencies.async_session_factory)):
+    return await snapshot_response_async(request, 'apps-detailed', _build_apps_detailed(session_factory, read_session_factory),
+                                         revalidate_in_background=True, persist=True,
+                                         async_build=_build_apps_detailed_async(session_factory, read_session_factory, async_session_factory))
+
+
+@router.get("/api/v1/apps-detailed/changes")
+def apps_detailed_changes(since: int = 0, session_factory = Depends(dependencies.session_factory),
+                          replica_session_factory = Depends(dependencies.replica_session_factory)) -> AllAppsConfigChangesDTO:
+    # changes and generation come from the same snapshot, so lagging replica only returns older generation
+    changes = AppService(session_factory, replica_session_factory).get_config_changes_since(since)
+    return AllAppsConfigChangesDTO.from_domain_model(changes)
+
+
+@router.get("/api/v1/apps-detailed/watch")
+async def apps_detailed_watch(etag: str | None = None, timeout: float = 30, session_factory = Depends(dependencies.session_factory),
+                              read_session_factory = Depends(dependencies.read_session_factory),
+                              async_session_factory = Depends(dependencies.async_session_factory)) -> ConfigWatchDTO:
+    """
+    Long poll that returns as soon as apps-detailed ETag differs from given one, or after timeout.
+    Pass ETag of fetched apps-detailed config, refetch it when changed and keep watching with returned ETag.
+    ETag depends only on config content, so it is the same on every replica.
+    """
+    build = _build_apps_detailed(session_factory, read_session_factory)
+    async_build = _build_apps_detailed_async(session_factory, read_session_factory, async_session_factory)
+    deadline = time.monotonic() + min(timeout, WATCH_MAX_TIMEOUT_SECONDS)
+    while True:
+        generation = config_generation.current()
+        snapshot = await current_snapshot_async('apps-detailed', build, persist=True, async_build=async_build)
+        changed = not etag_matches(etag, *snapshot.etags())
+        remaining = deadline - time.monotonic()
+        if changed or remaining <= 0:
+            return ConfigWatchDTO(etag=snapshot.etag, changed=changed)
+        # change of generation does not always change content, then watch goes on
+        await config_generation.wait_for_change(generation, remaining)
+
+
+@router.get("/api/v1/apps/{app_id}/config", response_model=SingleAppConfigDTO)
+async def app_config(request: Request, app_id: str, session_factory = Depends(dependencies.session_factory),
+                     read_session_factory = Depends(dependencies.read_session_factory)):
+    app_id = AppId(app_id)
+    def build():
+        events_by_app = AppService(session_factory, read_session_factory).get_success_events_of_app(app_id)
+        return SingleAppConfigDTO.from_domain_model(events_by_app.apps_by_id[app_id], events_by_app)
+    return await snapshot_response_async(request, f'apps/{app_id.value}/config', build)
 
 
-@router.get("/api/v1/apps-detailed")
-def apps_detailed(session_factory = Depends(dependencies.session_factory)) -> AllAppsConfigDTO:
-    events_by_app = AppService(session_factory).get_all_success_events_by_app()
-    app_list = AppService(session_factory).get_all_success()
-    return  AllAppsConfigDTO.from_domain_model(app_list, events_by_app)
+@router.put("/api/v1/apps/datasource-freshness")
+def update_datasources_freshness(updates: List[DatasourceFreshnessDTO], session_factory = Depends(dependencies.session_factory)) -> int:
+    """
+    Updates freshness of many datasources at once. Returns number of datasources created or moved forward.
+    """
+    return AppService(session_factory).update_datasources_freshness(updates)
 
 
 @router.put("/api/v1/apps/{app_id}/datasource-freshness/{datasource_id}/{has_data_up_to_date}")
 def update_datasource_freshness(app_id: str, datasource_id: str, has_data_up_to_date: date, session_factory = Depends(dependencies.session_factory)):
-    AppService(session_factory).update_datasource_freshness(AppId(app_id), datasource_id, has_data_up_to_date)
+    # with write-behind buffer, update is written by next flush and unknown apps are only logged then
+    if not freshness_buffer.add(AppId(app_id).value, datasource_id, has_data_up_to_date):
+        AppService(session_factory).update_datasource_freshness(AppId(app_id), datasource_id, has_data_up_to_date)
     return "ok"
\ No newline at end of file
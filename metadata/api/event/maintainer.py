@@ -19,9 +19,11 @@ from fastapi.logger import logger
 from metadata.core.domain.app import App
 from metadata.core.event_tables_creator import BigQueryEventTablesCreator
 from metadata.core.gcs_iglu_uploader import GcsIgluUploader
-from metadata.core.domain.event import AtomicParameter, Event, EventContext
+from metadata.core.domain.event import Event
 from metadata.core.domain.status import Status
-from metadata.core.database import utils
+from metadata.core.database import orm, utils
+from metadata.core.database import config_notifications
+from metadata.core.system_catalog import get_system_catalog
 
 
 class EventMaintainer:
@@ -34,12 +36,15 @@ class EventMaintainer:
         with self.db_session() as session:
             utils.maintainer_lock(session)
 
-            events: List[Event] = session.scalars(select(Event).where(Event.status != Status.SUCCESS)).unique().all()
+            # ids first, so an idle pass only reads the partial index and full events are loaded only for matched ids
+            ids = session.scalars(select(orm.event_table.c.id).where(utils.not_success(orm.event_table.c.status))).all()
+            events: List[Event] = session.scalars(select(Event).where(Event.id.in_(ids))).unique().all() if ids else []
 
             logger.info(f"Got {len(events)} events to process")
             if events:
-                atomic_parameters = session.scalars(select(AtomicParameter)).all()
-                event_contexts = session.scalars(select(EventContext).where(EventContext.embedded_in_event == True)).unique().all()
+                catalog = get_system_catalog(self.db_session)
+                atomic_parameters = catalog.atomic_parameters
+                event_contexts = catalog.embedded_event_contexts
 
                 for idx, event in enumerate(events):
                     event: Event
@@ -60,7 +65,7 @@ class EventMaintainer:
                     app: App = session.scalars(select(App).where(App.id == event.app_id)).unique().one()
                     if app.status == Status.SUCCESS:
                         app.set_status(Status.NEEDS_UPDATE)
-                    session.commit()
+                    config_notifications.commit_config_change(session)
 
 
             logger.info("Processed events")
@@ -59,4 +59,10 @@ class PublicEventViewDTO:
 class PublicEventListDTO:
     events: List[PublicEventViewDTO]
     parameter_types: List[ParameterType]
-    system_parameters: Dict[str, List[PublicEventSystemParameterDTO]]
\ No newline at end of file
+    system_parameters: Dict[str, List[PublicEventSystemParameterDTO]]
+
+@dataclass(frozen=True)
+class EventResultDTO:
+    name: str
+    # why event was not applied, None when it is valid
+    error: str | None = None
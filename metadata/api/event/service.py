@@ -12,26 +12,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Callable, ContextManager, List
+from typing import Callable, ContextManager, List, Set
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.orm import Session
 from metadata.api.event.request import CreateOrUpdateEventDTO
-from metadata.api.event.response import PublicEventDTO, PublicEventListDTO, PublicEventParameterDTO, PublicEventSystemParameterDTO, PublicEventViewDTO
-from metadata.core.domain.app import AppId
+from metadata.core.database import config_notifications
+from metadata.api.event.response import EventResultDTO, PublicEventDTO, PublicEventListDTO, PublicEventParameterDTO, PublicEventSystemParameterDTO, PublicEventViewDTO
+from metadata.core.domain.app import AppId, event_vendor
 from metadata.core.domain.common import EntityError, EntityNotFound
-from metadata.core.domain.event import AtomicParameter, Event, EventContext
-from metadata.core.domain.schema import ParameterType, Schema, SchemaParameter
+from metadata.core.domain.event import AtomicParameter, Event, EventContext, event_datasource_id
+from metadata.core.domain.schema import ParameterType, Schema, SchemaParameter, default_alias
 from metadata.core.domain.status import Status
+from metadata.core.database import loading, orm
+from metadata.core.system_catalog import get_system_catalog
 from hashlib import md5
 
 
 
 class EventService:
-    def __init__(self, db_session: Callable[[], ContextManager[Session]]):
+    def __init__(self, db_session: Callable[[], ContextManager[Session]],
+                 read_db_session: Callable[[], ContextManager[Session]] | None = None):
         self.db_session = db_session
+        # pure reads that may be served by read replica
+        self.read_db_session = read_db_session or db_session
 
     def create_or_update_event(self, app_id: AppId, create_event_request: CreateOrUpdateEventDTO) -> Event:
+        # loaded before the session, so a catalog build never needs a second connection while the lock is held
+        atomic_parameters = get_system_catalog(self.db_session).get_atomic_parameter_names()
         with self.db_session() as session:
             # avoid concurrent updates
             # pg_try_advisory_xact_lock needs 32 bit integer
@@ -41,51 +50,104 @@ class EventService:
             event: Event = session.scalars(
                 select(Event).where(and_(
                     Event.app_id == app_id,
-                    Event.schema_id.in_(select(Schema.id).where(Schema.name == create_event_request.name))
+                    Event.schema_id.in_(self._schema_ids(app_id, Schema.name == create_event_request.name))
                 ))).unique().one_or_none()
 
-            if event:
-                schema = event.get_schema()
-                schema.description = create_event_request.description
-                for parameter in create_event_request.existing_parameters:
-                    existing_parameter = schema.get_parameter_by_name(parameter.name)
-                    existing_parameter.description = parameter.description
-                    existing_parameter.alias = parameter.alias
-                    existing_parameter.is_gdpr = parameter.is_gdpr
-            else:
+            is_new = event is None
+            if is_new:
                 event = Event.create_game_specific(app_id=app_id, name=create_event_request.name, description=create_event_request.description, alias=create_event_request.alias)
                 session.add(event)
 
-            atomic_parameters={atomic.name for atomic in session.scalars(select(AtomicParameter)).all()}
-            if create_event_request.new_parameters:
-                for parameter in create_event_request.new_parameters:
-                    if parameter.name in atomic_parameters:
-                        raise EntityError('Event parameter must not be equal to any current atomic parameter')
-                event.add_parameters([SchemaParameter(
-                    name=parameter.name,
-                    type=parameter.type,
-                    introduced_at_version=parameter.introduced_at_version,
-                    description=parameter.description,
-                    alias=parameter.alias,
-                    is_gdpr=parameter.is_gdpr,
-                ) for parameter in create_event_request.new_parameters])
-
-                if event.status == Status.SUCCESS:
-                    event.set_status(Status.NEEDS_UPDATE)
+            self._apply_request(event, create_event_request, atomic_parameters, is_new)
 
             try:
-                session.commit()
+                config_notifications.commit_config_change(session)
             except IntegrityError as exc:
                 raise EntityError() from exc
             return event
 
-    def get_event_by_name(self, app_id: AppId, event_name: str) -> PublicEventDTO:
+    def create_or_update_events(self, app_id: AppId, requests: List[CreateOrUpdateEventDTO]) -> List[EventResultDTO]:
+        """
+        Same as create_or_update_event for many events, checked against a single catalog load and applied in one transaction.
+        Changes are committed only if every event is valid, otherwise nothing is applied and results tell what is wrong.
+        """
+        if not requests:
+            return []
+        atomic_parameters = get_system_catalog(self.db_session).get_atomic_parameter_names()
+        names = [request.name for request in requests]
         with self.db_session() as session:
+            # same locks as create_or_update_event, taken in one query
+            lock = func.unnest(array(sorted({self.get_hash_int32(f"{app_id}.{name}") for name in names}))).column_valued('lock')
+            session.execute(select(func.pg_try_advisory_xact_lock(lock)))
+
+            events_by_name = {event.schema.name: event for event in session.scalars(
+                select(Event).where(and_(
+                    Event.app_id == app_id,
+                    Event.schema_id.in_(self._schema_ids(app_id, Schema.name.in_(names)))
+                ))).unique().all()}
+
+            results: List[EventResultDTO] = []
+            applied_names = set()
+            for request in requests:
+                try:
+                    if request.name in applied_names:
+                        raise EntityError(f'Event {request.name} is listed more than once')
+                    applied_names.add(request.name)
+
+                    event = events_by_name.get(request.name)
+                    is_new = event is None
+                    if is_new:
+                        event = Event.create_game_specific(app_id=app_id, name=request.name, description=request.description, alias=request.alias)
+                        session.add(event)
+                    self._apply_request(event, request, atomic_parameters, is_new)
+                    results.append(EventResultDTO(name=request.name))
+                except EntityError as exc:
+                    results.append(EventResultDTO(name=request.name, error=str(exc) or 'Invalid event'))
+
+            if any(result.error for result in results):
+                session.rollback()
+                return results
+
+            try:
+                # new schemas and parameters of all events are inserted in a single flush
+                config_notifications.commit_config_change(session)
+            except IntegrityError as exc:
+                raise EntityError() from exc
+        return results
+
+    def _apply_request(self, event: Event, request: CreateOrUpdateEventDTO, atomic_parameters: Set[str], is_new: bool):
+        if not is_new:
+            schema = event.get_schema()
+            schema.description = request.description
+            for parameter in request.existing_parameters:
+                existing_parameter = schema.get_parameter_by_name(parameter.name)
+                existing_parameter.description = parameter.description
+                existing_parameter.alias = parameter.alias
+                existing_parameter.is_gdpr = parameter.is_gdpr
+
+        if request.new_parameters:
+            for parameter in request.new_parameters:
+                if parameter.name in atomic_parameters:
+                    raise EntityError('Event parameter must not be equal to any current atomic parameter')
+            event.add_parameters([SchemaParameter(
+                name=parameter.name,
+                type=parameter.type,
+                introduced_at_version=parameter.introduced_at_version,
+                description=parameter.description,
+                alias=parameter.alias,
+                is_gdpr=parameter.is_gdpr,
+            ) for parameter in request.new_parameters])
+
+            if event.status == Status.SUCCESS:
+                event.set_status(Status.NEEDS_UPDATE)
+
+    def get_event_by_name(self, app_id: AppId, event_name: str) -> PublicEventDTO:
+        with self.read_db_session() as session:
             try:
                 event: Event = session.scalars(
-                    select(Event).where(and_(
+                    select(Event).options(*loading.event_detail()).where(and_(
                         Event.app_id == app_id,
-                        Event.schema_id.in_(select(Schema.id).where(Schema.name == event_name)))
+                        Event.schema_id.in_(self._schema_ids(app_id, Schema.name == event_name)))
                 )).unique().one()
 
                 schema = event.get_schema()
@@ -108,11 +170,32 @@ class EventService:
             except NoResultFound as exc:
                 raise EntityNotFound() from exc
 
-    def get_all_event_views(self, app_id: AppId) -> PublicEventListDTO:
-        with self.db_session() as session:
-            events = session.scalars(select(Event).where(Event.app_id == app_id)).unique().all()
-            atomic_parameters: List[AtomicParameter] = session.scalars(select(AtomicParameter)).all()
-            event_contexts: List[EventContext] = session.scalars(select(EventContext).where(EventContext.embedded_in_event == True)).unique().all()
+    def get_all_event_views(self, app_id: AppId, after: str | None = None, limit: int | None = None,
+                            status: Status | None = None, prefix: str | None = None) -> PublicEventListDTO:
+        """
+        Events are ordered by name and filtered in the database. Page starts after given event name and has at most limit events.
+        """
+        event, schema = orm.event_table, orm.schema_table
+        query = select(schema.c.name, schema.c.alias, schema.c.description)\
+            .select_from(event.join(schema, event.c.schema_id == schema.c.id))\
+            .where(event.c.app_id == app_id.value)\
+            .order_by(schema.c.name)
+        if status:
+            query = query.where(event.c.status == status.value)
+        if prefix:
+            query = query.where(schema.c.name.startswith(prefix, autoescape=True))
+        if after:
+            query = query.where(schema.c.name > after)
+        if limit:
+            query = query.limit(limit)
+
+        catalog = get_system_catalog(self.read_db_session)
+        atomic_parameters: List[AtomicParameter] = catalog.atomic_parameters
+        event_contexts: List[EventContext] = catalog.embedded_event_contexts
+        with self.read_db_session() as session:
+            # plain columns straight into views, without loading events and schemas as entities
+            events = [PublicEventViewDTO(row.name, row.alias or default_alias(row.name), row.description, event_datasource_id(row.name))
+                      for row in session.execute(query)]
 
             system_parameters = {
                 'Atomic': [PublicEventSystemParameterDTO(
@@ -132,11 +215,16 @@ class EventService:
                 ]
 
             return PublicEventListDTO(
-                events=[PublicEventViewDTO(e.schema.name, e.schema.get_alias(), e.schema.description, e.datasource_id) for e in events],
+                events=events,
                 parameter_types=list(ParameterType),
                 system_parameters=system_parameters
             )
 
+    def _schema_ids(self, app_id: AppId, name_filter):
+        # schemas of all events of an app have its event vendor, so (vendor, name) unique index finds them
+        # without scanning schemas of other apps
+        return select(Schema.id).where(and_(Schema.vendor == event_vendor(app_id), name_filter))
+
     def get_hash_int32(self, string_to_hash: str) -> int:
         hash_obj = md5(string_to_hash.encode())
         # Get the first 4 bytes of the hash as an integer
@@ -12,31 +12,77 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter, Depends
+from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from metadata.api.app.service import AppService
 from metadata.api.event.request import CreateOrUpdateEventDTO
+from metadata.api.event.response import EventResultDTO, PublicEventDTO, PublicEventListDTO
 from metadata.api.event.service import EventService
 from metadata.core.domain.app import AppId
+from metadata.core.domain.status import Status
+from metadata.api.snapshot import snapshot_response_async
 from metadata.logging.router import LoggingRoute
 from metadata import dependencies
 
 router = APIRouter(route_class=LoggingRoute, tags=["event"])
 
+MAX_PAGE_SIZE = 1000
 
-@router.get("/api/v1/apps/{app_id}/events")
-def get_events(app_id: str, session_factory = Depends(dependencies.session_factory)):
-    app = AppService(session_factory).get_by_app_id(AppId(app_id))
-    return EventService(session_factory).get_all_event_views(app.id)
 
+@router.get("/api/v1/apps/{app_id}/events", response_model=PublicEventListDTO)
+async def get_events(request: Request, response: Response, app_id: str, after: str | None = None,
+                     limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE), status: Status | None = None, prefix: str | None = None,
+                     session_factory = Depends(dependencies.session_factory),
+                     read_session_factory = Depends(dependencies.read_session_factory),
+                     replica_session_factory = Depends(dependencies.replica_session_factory)):
+    """
+    Lists all events of an app, or a page of them when filtered or limited. Name of the last event of a full page
+    is returned in X-Next-Cursor header and is passed as after to get the next page.
+    """
+    app_id = AppId(app_id)
+    if after or limit or status or prefix:
+        def get_page():
+            app = AppService(session_factory, replica_session_factory).get_minimal_by_app_id(app_id)
+            return EventService(session_factory, replica_session_factory).get_all_event_views(app.id, after, limit, status, prefix)
+        page = await run_in_threadpool(get_page)
+        if limit and len(page.events) == limit:
+            response.headers['X-Next-Cursor'] = page.events[-1].name
+        return page
 
-@router.get("/api/v1/apps/{app_id}/events/{event_name}")
-def get_event(app_id: str, event_name: str, session_factory = Depends(dependencies.session_factory)):
-    app = AppService(session_factory).get_by_app_id(AppId(app_id))
-    return EventService(session_factory).get_event_by_name(app.id, event_name)
+    def build():
+        app = AppService(session_factory, read_session_factory).get_minimal_by_app_id(app_id)
+        return EventService(session_factory, read_session_factory).get_all_event_views(app.id)
+    return await snapshot_response_async(request, f'apps/{app_id.value}/events', build, persist=True)
+
+
+@router.get("/api/v1/apps/{app_id}/events/{event_name}", response_model=PublicEventDTO)
+async def get_event(request: Request, app_id: str, event_name: str, session_factory = Depends(dependencies.session_factory),
+                    read_session_factory = Depends(dependencies.read_session_factory)):
+    app_id = AppId(app_id)
+    def build():
+        app = AppService(session_factory, read_session_factory).get_minimal_by_app_id(app_id)
+        return EventService(session_factory, read_session_factory).get_event_by_name(app.id, event_name)
+    return await snapshot_response_async(request, f'apps/{app_id.value}/events/{event_name}', build)
 
 
 @router.post("/api/v1/apps/{app_id}/events")
 def create_or_update_event(app_id: str, request: CreateOrUpdateEventDTO, session_factory = Depends(dependencies.session_factory)):
-    app = AppService(session_factory).get_by_app_id(AppId(app_id))
+    app = AppService(session_factory).get_minimal_by_app_id(AppId(app_id))
     EventService(session_factory).create_or_update_event(app.id, request)
     return "ok"
+
+
+@router.post("/api/v1/apps/{app_id}/events/bulk", response_model=List[EventResultDTO])
+def create_or_update_events(app_id: str, requests: List[CreateOrUpdateEventDTO], session_factory = Depends(dependencies.session_factory)):
+    """
+    Creates or updates many events at once. Events are applied only if all of them are valid,
+    otherwise response is 400 and lists error of each invalid event.
+    """
+    app = AppService(session_factory).get_minimal_by_app_id(AppId(app_id))
+    results = EventService(session_factory).create_or_update_events(app.id, requests)
+    if any(result.error for result in results):
+        return JSONResponse(jsonable_encoder(results), status_code=400)
+    return results
@@ -0,0 +1,53 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Callable, ContextManager, List
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+from metadata.core.database import loading, orm
+from metadata.core.domain.common import EntityNotFound
+from metadata.core.domain.event import Event, IgluSchemaGenerator
+from metadata.core.domain.iglu import IgluSchema
+from metadata.core.domain.schema import RawSchema
+from metadata.core.system_catalog import get_system_catalog
+
+
+class IgluService:
+    def __init__(self, db_session: Callable[[], ContextManager[Session]]):
+        self.db_session = db_session
+
+    def get_schema(self, vendor: str, name: str, version: str) -> IgluSchema:
+        """
+        Resolves schema the same way it is uploaded to the schema bucket: raw schemas by path,
+        then schemas generated from event contexts and events.
+        """
+        path = f'{vendor}/{name}/jsonschema/{version}'
+        with self.db_session() as session:
+            raw_schema: RawSchema | None = session.get(RawSchema, path)
+            if raw_schema:
+                return IgluSchema(path=raw_schema.path, schema=raw_schema.schema)
+
+        generators: List[IgluSchemaGenerator] = [c for c in get_system_catalog(self.db_session).event_contexts
+                                                 if c.schema.vendor == vendor and c.override_url_schema_name() == name]
+        if not generators:
+            with self.db_session() as session:
+                generators = session.scalars(select(Event).options(*loading.event_detail())
+                    .join(orm.schema_table, Event.schema_id == orm.schema_table.c.id)
+                    .where(and_(orm.schema_table.c.vendor == vendor, orm.schema_table.c.name == name))).unique().all()
+
+        for generator in generators:
+            for iglu_schema in generator.to_iglu_schemas():
+                if iglu_schema.path == path:
+                    return iglu_schema
+        raise EntityNotFound()
@@ -0,0 +1,36 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from fastapi import APIRouter, Depends, Request
+from metadata.api.iglu.service import IgluService
+from metadata.api.snapshot import snapshot_response_async
+from metadata.logging.router import LoggingRoute
+from metadata import dependencies
+
+router = APIRouter(route_class=LoggingRoute, tags=["iglu"])
+
+# schema content changes only when descriptions are edited, clients revalidate with ETag after that
+SCHEMA_CACHE_CONTROL = 'public, max-age=3600'
+
+
+@router.get("/api/schemas/{vendor}/{name}/jsonschema/{version}")
+async def get_schema(request: Request, vendor: str, name: str, version: str,
+                     read_session_factory = Depends(dependencies.read_session_factory)):
+    """
+    Iglu registry compatible schema lookup, serving the same schemas maintainers upload to the schema bucket.
+    """
+    def build():
+        return IgluService(read_session_factory).get_schema(vendor, name, version).schema
+    return await snapshot_response_async(request, f'iglu/{vendor}/{name}/jsonschema/{version}', build,
+                                         headers={'Cache-Control': SCHEMA_CACHE_CONTROL})
@@ -18,7 +18,8 @@ from sqlalchemy.orm import Session
 from fastapi.logger import logger
 from metadata.core.domain.app import Organization
 from metadata.core.domain.status import Status
-from metadata.core.database import utils
+from metadata.core.database import orm, utils
+from metadata.core.database import config_notifications
 from metadata.api.organization.internal import gcp_project_iam
 
 
@@ -31,7 +32,9 @@ class OrganizationMaintainer:
     def process_non_success(self):
         with self.db_session() as session:
             utils.maintainer_lock(session)
-            organizations: List[Organization] = session.scalars(select(Organization).where(Organization.status != Status.SUCCESS)).unique().all()
+            # ids first, so an idle pass only reads the partial index
+            ids = session.scalars(select(orm.organization_table.c.id).where(utils.not_success(orm.organization_table.c.status))).all()
+            organizations: List[Organization] = session.scalars(select(Organization).where(Organization.id.in_(ids))).unique().all() if ids else []
             logger.info(f"Got {len(organizations)} organizations to process")
             if organizations:
                 for idx, organization in enumerate(organizations):
@@ -41,5 +44,5 @@ class OrganizationMaintainer:
                         role = f"projects/{organization.gcp_project_id}/roles/gametuner.clientAdmin"
                         gcp_project_iam.set_role_members(organization.gcp_project_id, role, [o.principal for o in organization.gcp_project_principals])
                     organization.set_status(Status.SUCCESS)
-                    session.commit()
+                    config_notifications.commit_config_change(session)
             logger.info("Processed organizations")
@@ -21,7 +21,8 @@ from metadata.core.domain.iglu import IgluSchema
 from metadata.core.domain.schema import RawSchema
 from metadata.core.domain.status import Status
 from metadata.core.gcs_iglu_uploader import GcsIgluUploader
-from metadata.core.database import utils
+from metadata.core.database import orm, utils
+from metadata.core.database import config_notifications
 
 
 class RawSchemaMaintainer:
@@ -33,7 +34,9 @@ class RawSchemaMaintainer:
         with self.db_session() as session:
             utils.maintainer_lock(session)
 
-            raw_schemas: List[RawSchema] = session.scalars(select(RawSchema).filter(RawSchema.status != Status.SUCCESS)).all()
+            # ids first, so an idle pass only reads the partial index
+            paths = session.scalars(select(orm.raw_schema_table.c.path).where(utils.not_success(orm.raw_schema_table.c.status))).all()
+            raw_schemas: List[RawSchema] = session.scalars(select(RawSchema).where(RawSchema.path.in_(paths))).all() if paths else []
             if raw_schemas:
                 logger.info(f"Got {len(raw_schemas)} raw schemas to process")
                 for idx, raw_schema in enumerate(raw_schemas):
@@ -46,6 +49,6 @@ class RawSchemaMaintainer:
                         ))
                     logger.info(f"Processing raw schema {raw_schema.path} [{idx + 1} / {len(raw_schemas)}]")
                     raw_schema.set_status(Status.SUCCESS)
-                    session.commit()
+                    config_notifications.commit_config_change(session)
 
             logger.info("Processed raw schemas")
\ No newline at end of file
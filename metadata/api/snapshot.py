@@ -0,0 +1,265 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import os
+import tempfile
+import time
+import orjson
+from dataclasses import dataclass
+from hashlib import md5
+from typing import Awaitable, Callable, Dict, List
+from urllib.parse import quote
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.logger import logger
+from sqlalchemy.exc import InterfaceError, OperationalError
+from metadata.config import settings
+from metadata.core.config_cache import CacheEntry, config_cache, config_generation
+
+# below this size compression saves less than it costs
+GZIP_MIN_SIZE = 1024
+# asyncpg reports refused connections as OSError, not wrapped by SQLAlchemy
+ASYNC_DATABASE_UNAVAILABLE = (OperationalError, InterfaceError, OSError)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    body: bytes
+    etag: str
+    gzip_body: bytes | None = None
+
+    @classmethod
+    def render(cls, content: object) -> 'Snapshot':
+        # orjson writes dataclasses, dates and enums straight to bytes, anything else goes through FastAPI encoder
+        return cls.from_body(orjson.dumps(content, default=jsonable_encoder))
+
+    @classmethod
+    def from_body(cls, body: bytes) -> 'Snapshot':
+        # compressed once per generation, not per request
+        gzip_body = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+        return cls(body=body, etag=f'"{md5(body).hexdigest()}"', gzip_body=gzip_body)
+
+    @property
+    def gzip_etag(self) -> str:
+        # compressed body is a different representation, so it has its own strong validator
+        return self.etag[:-1] + '-gzip"'
+
+    def etags(self) -> List[str]:
+        return [self.etag, self.gzip_etag] if self.gzip_body is not None else [self.etag]
+
+
+def _snapshot_file(key: str) -> str:
+    return os.path.join(settings.SNAPSHOT_DIR, quote(key, safe='') + '.json')
+
+
+def store_snapshot(key: str, snapshot: Snapshot):
+    """
+    Atomically replaces snapshot file, so readers never see a partially written one.
+    """
+    file = None
+    try:
+        os.makedirs(settings.SNAPSHOT_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=settings.SNAPSHOT_DIR, delete=False) as file:
+            file.write(snapshot.body)
+        os.replace(file.name, _snapshot_file(key))
+    except OSError:
+        logger.exception(f'Failed to store snapshot {key}')
+        if file is not None:
+            try:
+                os.unlink(file.name)
+            except FileNotFoundError:
+                pass
+
+
+def load_snapshot(key: str) -> CacheEntry | None:
+    """
+    Snapshot stored by this or previous process, as an entry outdated for any config generation.
+    """
+    try:
+        with open(_snapshot_file(key), 'rb') as file:
+            body = file.read()
+            stored_seconds_ago = time.time() - os.fstat(file.fileno()).st_mtime
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # unreadable snapshot is only a missed head start, entry is built from database instead
+        logger.exception(f'Failed to load snapshot {key}')
+        return None
+    return CacheEntry(generation=-1, value=Snapshot.from_body(body), built_at=time.monotonic() - stored_seconds_ago)
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    if not accept_encoding:
+        return False
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            q = params.strip().removeprefix('q=')
+            try:
+                return not q or float(q) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def etag_matches(if_none_match: str | None, *etags: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') in etags:
+            return True
+    return False
+
+
+def snapshot_response(request: Request, key: str, build: Callable[[], object], headers: Dict[str, str] | None = None,
+                      revalidate_in_background: bool = False, persist: bool = False) -> Response:
+    """
+    Serve response content from snapshot cached for current config generation, building it only when outdated.
+    Answers 304 when client already has the same content, and sends gzip compressed body when client accepts it.
+    With revalidate_in_background, when enabled in settings, last built snapshot is served right away and rebuilt
+    in background, and Age header tells how old it is.
+    With persist, when snapshot dir is set, snapshot is also stored on disk. Stored snapshot is served after restart
+    until rebuilt in background, and whenever database is unavailable.
+    """
+    persist = persist and bool(settings.SNAPSHOT_DIR)
+    render = _renderer(key, build, persist)
+    headers = headers or {}
+    try:
+        if revalidate_in_background and settings.SNAPSHOT_STALE_WHILE_REVALIDATE == '1':
+            entry = config_cache.get_or_revalidate(key, render, settings.SNAPSHOT_TTL_SECONDS)
+            snapshot: Snapshot = entry.value
+            headers = headers | {'Age': str(int(entry.age_seconds()))}
+        else:
+            snapshot: Snapshot = config_cache.get_or_build(key, render)
+    except (OperationalError, InterfaceError):
+        entry = config_cache.peek(key)
+        if entry is None:
+            raise
+        logger.exception(f'Serving last snapshot of {key}, database is unavailable')
+        snapshot: Snapshot = entry.value
+        headers = headers | {'Age': str(int(entry.age_seconds()))}
+
+    return _respond(request, snapshot, headers)
+
+
+async def snapshot_response_async(request: Request, key: str, build: Callable[[], object], headers: Dict[str, str] | None = None,
+                                  revalidate_in_background: bool = False, persist: bool = False,
+                                  async_build: Callable[[], Awaitable[object]] | None = None) -> Response:
+    """
+    Same as snapshot_response, for async routes. Snapshot that is up to date is served right on the event loop,
+    anything that may need to build or load it runs in threadpool. With async_build, outdated snapshot is built
+    with it on the event loop, unless it is revalidated in background.
+    """
+    revalidating = revalidate_in_background and settings.SNAPSHOT_STALE_WHILE_REVALIDATE == '1'
+    headers = headers or {}
+    entry = config_cache.peek(key)
+    if entry is not None and entry.generation == config_generation.current() \
+            and not (revalidating and entry.age_seconds() > settings.SNAPSHOT_TTL_SECONDS):
+        if revalidating:
+            headers = headers | {'Age': str(int(entry.age_seconds()))}
+        return _respond(request, entry.value, headers)
+    if async_build is None or revalidating:
+        return await run_in_threadpool(snapshot_response, request, key, build, headers, revalidate_in_background, persist)
+
+    try:
+        snapshot = await _get_or_build_async(key, async_build, persist)
+    except ASYNC_DATABASE_UNAVAILABLE:
+        entry = config_cache.peek(key)
+        if entry is None:
+            raise
+        logger.exception(f'Serving last snapshot of {key}, database is unavailable')
+        return _respond(request, entry.value, headers | {'Age': str(int(entry.age_seconds()))})
+    return _respond(request, snapshot, headers)
+
+
+def current_snapshot(key: str, build: Callable[[], object], persist: bool = False) -> Snapshot:
+    """
+    Snapshot for current config generation, the one snapshot_response serves for the same key once it is up to date.
+    Last built snapshot is returned while database is unavailable.
+    """
+    render = _renderer(key, build, persist and bool(settings.SNAPSHOT_DIR))
+    try:
+        return config_cache.get_or_build(key, render)
+    except (OperationalError, InterfaceError):
+        entry = config_cache.peek(key)
+        if entry is None:
+            raise
+        logger.exception(f'Using last snapshot of {key}, database is unavailable')
+        return entry.value
+
+
+async def current_snapshot_async(key: str, build: Callable[[], object], persist: bool = False,
+                                 async_build: Callable[[], Awaitable[object]] | None = None) -> Snapshot:
+    """
+    Same as current_snapshot, for async routes. Snapshot that is up to date is returned right on the event loop,
+    and with async_build outdated one is built on the event loop too.
+    """
+    entry = config_cache.peek(key)
+    if entry is not None and entry.generation == config_generation.current():
+        return entry.value
+    if async_build is None:
+        return await run_in_threadpool(current_snapshot, key, build, persist)
+
+    try:
+        return await _get_or_build_async(key, async_build, persist)
+    except ASYNC_DATABASE_UNAVAILABLE:
+        entry = config_cache.peek(key)
+        if entry is None:
+            raise
+        logger.exception(f'Using last snapshot of {key}, database is unavailable')
+        return entry.value
+
+
+async def _get_or_build_async(key: str, async_build: Callable[[], Awaitable[object]], persist: bool) -> Snapshot:
+    persist = persist and bool(settings.SNAPSHOT_DIR)
+    if persist:
+        # stored snapshot is read from disk, off the event loop
+        await run_in_threadpool(config_cache.seed, key, lambda: load_snapshot(key))
+
+    async def render() -> Snapshot:
+        content = await async_build()
+        # serializing and compressing whole config would block the event loop
+        snapshot = await run_in_threadpool(Snapshot.render, content)
+        if persist:
+            await run_in_threadpool(store_snapshot, key, snapshot)
+        return snapshot
+
+    return await config_cache.get_or_build_async(key, render)
+
+
+def _renderer(key: str, build: Callable[[], object], persist: bool) -> Callable[[], Snapshot]:
+    def render() -> Snapshot:
+        snapshot = Snapshot.render(build())
+        if persist:
+            store_snapshot(key, snapshot)
+        return snapshot
+
+    if persist:
+        config_cache.seed(key, lambda: load_snapshot(key))
+    return render
+
+
+def _respond(request: Request, snapshot: Snapshot, headers: Dict[str, str]) -> Response:
+    gzipped = snapshot.gzip_body is not None and accepts_gzip(request.headers.get('accept-encoding'))
+    headers = headers | {'ETag': snapshot.gzip_etag if gzipped else snapshot.etag, 'Vary': 'Accept-Encoding'}
+    # either representation is the same content, so client holding the other one is still up to date
+    if etag_matches(request.headers.get('if-none-match'), *snapshot.etags()):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        headers['Content-Encoding'] = 'gzip'
+        return Response(content=snapshot.gzip_body, media_type='application/json', headers=headers)
+    return Response(content=snapshot.body, media_type='application/json', headers=headers)
@@ -0,0 +1,238 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from threading import Lock, Thread
+from fastapi.logger import logger
+from typing import Awaitable, Callable, Dict, List, Set, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class ConfigGeneration:
+    """
+    Process wide counter of configuration changes.
+    Every write that can change what read endpoints return bumps it, so anything built under an older generation is outdated.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._generation = 0
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    def current(self) -> int:
+        return self._generation
+
+    def bump(self) -> int:
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            waiters, self._waiters = self._waiters, []
+        # writes happen in worker threads, waiters are woken up on their own event loops
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+        return generation
+
+    async def wait_for_change(self, generation: int, timeout: float) -> int:
+        """
+        Waits until current generation differs from given one, or until timeout expires. Returns current generation.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._generation != generation:
+                return self._generation
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return self._generation
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    generation: int
+    value: object
+    built_at: float = field(default_factory=time.monotonic)
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.built_at
+
+
+class ConfigCache:
+    """
+    Values built for current config generation. At most one build of the same value runs at a time,
+    and concurrent requests for it share that build. Outdated values are dropped once a newer generation is built,
+    except values that are served while outdated.
+    """
+
+    def __init__(self, generation: ConfigGeneration):
+        self._generation = generation
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = Lock()
+        self._builds: Dict[str, Future] = {}
+        # keys revalidated in background or seeded from elsewhere, their outdated entries are still served
+        self._retained: Set[str] = set()
+        self._swept_generation = 0
+
+    def get_or_build(self, key: str, builder: Callable[[], T]) -> T:
+        generation = self._generation.current()
+        while True:
+            entry = self._entries.get(key)
+            if entry and entry.generation >= generation:
+                return entry.value
+
+            build, owner = self._start_build(key)
+            if owner:
+                self._run_build(key, builder, build)
+            entry = build.result()
+            if entry.generation >= generation:
+                return entry.value
+            # joined build started before the change this request must see, next build includes it
+
+    async def get_or_build_async(self, key: str, builder: Callable[[], Awaitable[T]]) -> T:
+        """
+        Same as get_or_build, for builders running on the event loop. Waiting for a build does not hold a thread.
+        """
+        generation = self._generation.current()
+        while True:
+            entry = self._entries.get(key)
+            if entry and entry.generation >= generation:
+                return entry.value
+
+            build, owner = self._start_build(key)
+            if owner:
+                await self._run_build_async(key, builder, build)
+            entry = await asyncio.wrap_future(build)
+            if entry.generation >= generation:
+                return entry.value
+
+    def get_or_revalidate(self, key: str, builder: Callable[[], T], ttl_seconds: float) -> CacheEntry:
+        """
+        Returns cached entry even if it is outdated, and rebuilds it in background when outdated or older than ttl.
+        Only requests that find no entry at all wait for a build. Frequent changes do not pile up rebuilds,
+        changes made while one runs are picked up by a single follow-up rebuild.
+        """
+        generation = self._generation.current()
+        entry = self._entries.get(key)
+        self._retained.add(key)
+        if entry is None:
+            build, owner = self._start_build(key)
+            if owner:
+                self._run_build(key, builder, build)
+            return build.result()
+
+        if entry.generation != generation or entry.age_seconds() > ttl_seconds:
+            build, owner = self._start_build(key)
+            if owner:
+                Thread(target=self._rebuild, args=(key, builder, build), name=f'rebuild-{key}', daemon=True).start()
+        return entry
+
+    def _start_build(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            build = self._builds.get(key)
+            if build:
+                return build, False
+            build = self._builds[key] = Future()
+            return build, True
+
+    def _run_build(self, key: str, builder: Callable[[], T], build: Future):
+        # read generation before building, so a write that lands during the build leaves the entry outdated
+        generation = self._generation.current()
+        try:
+            value = builder()
+        except BaseException as exc:
+            self._fail_build(key, build, exc)
+        else:
+            self._finish_build(key, generation, value, build)
+
+    async def _run_build_async(self, key: str, builder: Callable[[], Awaitable[T]], build: Future):
+        generation = self._generation.current()
+        try:
+            value = await builder()
+        except BaseException as exc:
+            self._fail_build(key, build, exc)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+        else:
+            self._finish_build(key, generation, value, build)
+
+    def _finish_build(self, key: str, generation: int, value: object, build: Future):
+        entry = CacheEntry(generation=generation, value=value)
+        latest = self._entries.get(key)
+        # slow build must not replace value already built for a newer generation
+        if not latest or latest.generation <= generation:
+            self._entries[key] = entry
+            self._drop_outdated(generation)
+        with self._lock:
+            del self._builds[key]
+        build.set_result(entry)
+
+    def _fail_build(self, key: str, build: Future, exc: BaseException):
+        with self._lock:
+            del self._builds[key]
+        # waiting requests fail the same way instead of retrying the build one by one
+        build.set_exception(exc)
+
+    def _drop_outdated(self, generation: int):
+        # once per generation, so building many values after a change does not scan entries for each of them
+        with self._lock:
+            if generation <= self._swept_generation:
+                return
+            self._swept_generation = generation
+            self._entries = {key: entry for key, entry in self._entries.items()
+                             if entry.generation >= generation or key in self._retained}
+
+    def _rebuild(self, key: str, builder: Callable[[], T], build: Future, follow_up: bool = True):
+        self._run_build(key, builder, build)
+        if build.exception():
+            # previous entry keeps being served, next request after ttl retries
+            logger.error(f'Failed to rebuild {key} in background', exc_info=build.exception())
+        elif follow_up and build.result().generation != self._generation.current():
+            # all changes made during the build are picked up by a single follow-up build
+            next_build, owner = self._start_build(key)
+            if owner:
+                self._rebuild(key, builder, next_build, follow_up=False)
+
+    def peek(self, key: str) -> CacheEntry | None:
+        """
+        Returns cached entry of any generation, without building it.
+        """
+        return self._entries.get(key)
+
+    def seed(self, key: str, loader: Callable[[], CacheEntry | None]):
+        """
+        Sets entry loaded from elsewhere if there is no entry for the key yet.
+        """
+        self._retained.add(key)
+        if key not in self._entries:
+            entry = loader()
+            with self._lock:
+                if entry and key not in self._entries:
+                    self._entries[key] = entry
+
+    def clear(self):
+        self._entries = {}
+        self._retained = set()
+
+
+config_generation = ConfigGeneration()
+config_cache = ConfigCache(config_generation)
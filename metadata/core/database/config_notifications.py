@@ -0,0 +1,159 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import select as io_select
+import time
+import uuid
+from threading import Lock, Thread
+from fastapi.logger import logger
+from typing import Callable
+from sqlalchemy import Text, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from metadata.core.config_cache import config_generation
+
+CHANNEL = 'metadata_config'
+# identifies notifications sent by this process, those are already handled by local bump
+SENDER_ID = uuid.uuid4().hex
+# pg8000 has no way to wait for notifications, they are received while running queries
+POLL_INTERVAL_SECONDS = 1
+# idle psycopg2 connection is checked periodically, so a broken one is noticed and replaced
+IDLE_CHECK_SECONDS = 60
+RECONNECT_INTERVAL_SECONDS = 5
+
+# set when reads go to read replica, only then reads need WAL position of config changes
+track_change_lsn = False
+# primary WAL position after latest config change this process made or was notified of, until replica replays it
+_change_lsn: str | None = None
+_change_lsn_lock = Lock()
+
+
+def notify(session: Session):
+    """
+    Tells other replicas that config changed. Notification is delivered only if current transaction commits.
+    """
+    session.execute(select([func.pg_notify(CHANNEL, SENDER_ID)]))
+
+
+def commit_config_change(session: Session):
+    """
+    Commits transaction that changed config, telling other replicas about it, and bumps local generation
+    once changes are visible to reads.
+    """
+    notify(session)
+    session.commit()
+    try:
+        if track_change_lsn:
+            record_change_lsn(session.scalar(select([func.pg_current_wal_lsn().cast(Text)])))
+    except:
+        # change is committed, reads from replica only do not wait for it
+        logger.exception('Failed to read WAL position of config change')
+    finally:
+        config_generation.bump()
+
+
+def _lsn_position(lsn: str) -> int:
+    high, low = lsn.split('/')
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+def record_change_lsn(lsn: str):
+    global _change_lsn
+    with _change_lsn_lock:
+        if _change_lsn is None or _lsn_position(lsn) > _lsn_position(_change_lsn):
+            _change_lsn = lsn
+
+
+def latest_change_lsn() -> str | None:
+    """
+    Primary WAL position that reads from replica must wait for, None when replica already replayed every known change.
+    """
+    return _change_lsn
+
+
+def change_replayed(lsn: str):
+    global _change_lsn
+    with _change_lsn_lock:
+        if _change_lsn == lsn:
+            _change_lsn = None
+
+
+def _current_lsn(dbapi_connection) -> str:
+    cursor = dbapi_connection.cursor()
+    cursor.execute('SELECT pg_current_wal_lsn()::text')
+    return cursor.fetchone()[0]
+
+
+def _handle(payloads, current_lsn: Callable[[], str]):
+    if any(payload != SENDER_ID for payload in payloads):
+        if track_change_lsn:
+            # notification arrives after the commit, so current position covers the change
+            record_change_lsn(current_lsn())
+        config_generation.bump()
+
+
+def _listen_psycopg2(connection):
+    while True:
+        readable, _, _ = io_select.select([connection], [], [], IDLE_CHECK_SECONDS)
+        if not readable:
+            connection.cursor().execute('SELECT 1')
+        connection.poll()
+        payloads = [n.payload for n in connection.notifies]
+        connection.notifies.clear()
+        _handle(payloads, lambda: _current_lsn(connection))
+
+
+def _listen_pg8000(connection):
+    cursor = connection.cursor()
+    while True:
+        cursor.execute('SELECT 1')
+        payloads = [payload for _, _, payload in connection.notifications]
+        connection.notifications.clear()
+        _handle(payloads, lambda: _current_lsn(connection))
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+def _run_listener(engine: Engine):
+    while True:
+        connection = None
+        try:
+            # dedicated connection that is never returned to the pool
+            connection = engine.raw_connection()
+            connection.detach()
+            dbapi_connection = connection.connection
+            dbapi_connection.autocommit = True
+            dbapi_connection.cursor().execute(f'LISTEN {CHANNEL}')
+            # notifications could have been missed while not listening
+            if track_change_lsn:
+                record_change_lsn(_current_lsn(dbapi_connection))
+            config_generation.bump()
+            logger.info(f'Listening for config changes on {CHANNEL}')
+            if engine.dialect.driver == 'psycopg2':
+                _listen_psycopg2(dbapi_connection)
+            else:
+                _listen_pg8000(dbapi_connection)
+        except:
+            logger.exception('Config change listener failed')
+            if connection is not None:
+                try:
+                    connection.close()
+                except:
+                    pass
+        time.sleep(RECONNECT_INTERVAL_SECONDS)
+
+
+def start(engine: Engine):
+    _listener_thread = Thread(target=_run_listener, args=(engine,), name='config-listener')
+    _listener_thread.daemon = True
+    _listener_thread.start()
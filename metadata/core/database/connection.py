@@ -12,30 +12,127 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from contextlib import contextmanager
+import time
+from contextlib import asynccontextmanager, contextmanager
+from fastapi.logger import logger
 from google.cloud.sql.connector import Connector, IPTypes
+from opentelemetry.metrics import Observation
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy_utils import create_database, database_exists
 
+from metadata import monitoring
 from metadata.config import settings
+from metadata.core.database import config_notifications
+
+READ_REPLICA_POLL_SECONDS = 0.05
+
+pool_checkout_wait = monitoring.meter.create_histogram(
+    name="db_pool_checkout_wait",
+    description="Time spent waiting for a database connection from the pool",
+    unit="ms")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    Queue pool that records how long each checkout waits, long waits mean pool is too small for the load.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.record((time.perf_counter() - start) * 1000)
+
+
+def _pool_options() -> dict:
+    return dict(
+        poolclass=InstrumentedQueuePool,
+        # every threadpool worker can hold a connection, overflow covers background threads
+        pool_size=settings.DB_POOL_SIZE or settings.THREADPOOL_SIZE,
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING == "1",
+        echo=settings.DB_ECHO == "1",
+    )
+
+
+def set_statement_timeout(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"SET statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+    cursor.close()
+    # committed, so rollback on return to the pool does not undo it
+    dbapi_connection.commit()
+
+
+def _create_async_engine(database_url: str) -> AsyncEngine:
+    options = _pool_options()
+    # asyncpg needs pool adapted to asyncio, and sets statement timeout as a connection setting
+    options.pop("poolclass")
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(int(settings.DB_STATEMENT_TIMEOUT_MS))}
+    return create_async_engine(database_url, connect_args=connect_args, **options)
+
+
+def _create_engine(database_url: str, cloud_sql_instance: str) -> Engine:
+    if settings.CLOUD_SQL == "0":
+        created_engine = create_engine(database_url, **_pool_options())
+    else:
+        created_engine = create_engine(f"{settings.DB_DRIVER}://", creator=lambda: connector.connect(
+            cloud_sql_instance,
+            settings.CLOUD_SQL_DRIVER,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DATABASE_NAME,
+            ip_type=IPTypes.PRIVATE
+        ), **_pool_options())
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        event.listen(created_engine, "connect", set_statement_timeout)
+    return created_engine
+
 
 if settings.CLOUD_SQL == "0":
-    engine = create_engine(settings.SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, echo=True)
+    engine = _create_engine(settings.SQLALCHEMY_DATABASE_URL, "")
     if not database_exists(settings.SQLALCHEMY_DATABASE_URL):
         create_database(settings.SQLALCHEMY_DATABASE_URL)
+    has_read_replica = bool(settings.READ_REPLICA_DATABASE_URL)
 else:
     connector = Connector()
-    engine = create_engine(f"{settings.DB_DRIVER}://", creator=lambda: connector.connect(
-        settings.CLOUD_SQL_INSTANCE,
-        settings.CLOUD_SQL_DRIVER,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        db=settings.DATABASE_NAME,
-        ip_type=IPTypes.PRIVATE
-    ))
+    engine = _create_engine("", settings.CLOUD_SQL_INSTANCE)
+    has_read_replica = bool(settings.READ_REPLICA_CLOUD_SQL_INSTANCE)
+config_notifications.track_change_lsn = has_read_replica
+read_engine = _create_engine(settings.READ_REPLICA_DATABASE_URL, settings.READ_REPLICA_CLOUD_SQL_INSTANCE) if has_read_replica else engine
+
+# Cloud SQL connector cannot create asyncpg connections for SQLAlchemy 1.4, async reads connect by url
+async_engine = _create_async_engine(settings.ASYNC_DATABASE_URL) if settings.ASYNC_DATABASE_URL else None
+
+pools = {"primary": engine.pool, "replica": read_engine.pool} if has_read_replica else {"primary": engine.pool}
+if async_engine is not None:
+    pools["async"] = async_engine.sync_engine.pool
+
+monitoring.meter.create_observable_gauge(
+    name="db_pool_checked_out",
+    callbacks=[lambda options: [Observation(pool.checkedout(), {"pool": name}) for name, pool in pools.items()]],
+    description="Database connections currently in use",
+    unit="1")
+
+monitoring.meter.create_observable_gauge(
+    name="db_pool_overflow",
+    callbacks=[lambda options: [Observation(max(pool.overflow(), 0), {"pool": name}) for name, pool in pools.items()]],
+    description="Database connections open beyond pool size",
+    unit="1")
+
 SessionFactory = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+ReadSessionFactory = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine)
+AsyncSessionFactory = sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine, class_=AsyncSession) \
+    if async_engine is not None else None
 
 @contextmanager
 def get_db_session():
@@ -43,4 +140,73 @@ def get_db_session():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def replica_has_replayed(replica_connection: Connection, lsn: str) -> bool:
+    # replay position is null when server is not a replica, then it is up to date by definition
+    return replica_connection.execute(
+        text("SELECT pg_last_wal_replay_lsn() IS NULL OR pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"), {"lsn": lsn}
+    ).scalar()
+
+
+def _wait_for_replica(lsn: str) -> bool:
+    deadline = time.monotonic() + settings.READ_REPLICA_MAX_WAIT_SECONDS
+    with read_engine.connect() as replica_connection:
+        while not replica_has_replayed(replica_connection, lsn):
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(READ_REPLICA_POLL_SECONDS)
+    return True
+
+
+@contextmanager
+def get_read_db_session():
+    """
+    Session for pure reads, from read replica when one is configured. After a config change this process made or
+    was notified of, replica is first given time to replay it, so values built for the new config generation include it.
+    Falls back to primary when replica lags behind for too long.
+    """
+    if not has_read_replica:
+        with get_db_session() as db:
+            yield db
+        return
+
+    lsn = config_notifications.latest_change_lsn()
+    if lsn is None:
+        db = ReadSessionFactory()
+    elif _wait_for_replica(lsn):
+        # later reads no longer wait for this change
+        config_notifications.change_replayed(lsn)
+        db = ReadSessionFactory()
+    else:
+        logger.warning(f"Read replica has not replayed {lsn} in time, reading from primary")
+        db = SessionFactory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def get_replica_db_session():
+    """
+    Session for stateless reads that tolerate replica lag, from read replica when one is configured, without waiting for it.
+    """
+    db = ReadSessionFactory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def get_async_db_session():
+    """
+    Session for pure reads on the event loop, from primary database through async engine.
+    """
+    db = AsyncSessionFactory()
+    try:
+        yield db
+    finally:
+        await db.close()
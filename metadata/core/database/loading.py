@@ -0,0 +1,62 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Loading profiles, options that decide which relationships a query loads.
+Mappers eagerly load every relationship, which entities modified by maintainers and services rely on.
+Read paths pick a profile that loads only what they serialize, anything else raises on access instead of querying.
+"""
+
+from typing import Tuple
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from metadata.core.domain.app import App, Datasource
+from metadata.core.domain.event import CommonEvent, Event
+from metadata.core.domain.schema import Schema
+from metadata.core.domain.user_history import MaterializedColumn
+
+
+def app_minimal() -> Tuple:
+    """
+    App columns only, for single app lookups and existence checks.
+    """
+    return (raiseload('*'),)
+
+
+def app_fleet_config() -> Tuple:
+    """
+    Everything AppConfigDTO serializes: integrations, stores, backfill jobs, datasources with materialized columns.
+    """
+    return (
+        joinedload(App.appsflyer_integration),
+        joinedload(App.appsflyer_cost_etl_integration),
+        joinedload(App.store_itunes),
+        joinedload(App.store_google_play),
+        selectinload(App.event_backfill_jobs),
+        selectinload(App.datasources).selectinload(Datasource.materialized_columns).joinedload(MaterializedColumn.event).options(
+            joinedload(Event.schema).raiseload(Schema.parameters),
+            raiseload(Event.parent_common_event),
+        ),
+        raiseload('*'),
+    )
+
+
+def event_detail() -> Tuple:
+    """
+    Event with complete schema, including parameters inherited from common event.
+    """
+    return (
+        joinedload(Event.schema).selectinload(Schema.parameters),
+        joinedload(Event.parent_common_event).joinedload(CommonEvent.schema).selectinload(Schema.parameters),
+    )
+
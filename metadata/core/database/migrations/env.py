@@ -67,6 +67,8 @@ def run_migrations_online() -> None:
 
         with context.begin_transaction():
             conn.execute(f"SELECT pg_advisory_xact_lock({utils.MAINTAINER_LOCK_ID});")
+            # migrations may run longer than statement timeout of the app
+            conn.execute("SET LOCAL statement_timeout = 0;")
             context.run_migrations()
 
 
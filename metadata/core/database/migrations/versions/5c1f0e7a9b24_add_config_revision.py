@@ -0,0 +1,64 @@
+"""Add config revision
+
+Revision ID: 5c1f0e7a9b24
+Revises: 2e8174db065b
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5c1f0e7a9b24'
+down_revision = '2e8174db065b'
+branch_labels = None
+depends_on = None
+
+
+# keep in sync with orm.CONFIG_REVISION_TABLES and utils.CONFIG_REVISION_LOCK_ID
+TABLES = [
+    'app',
+    'appsflyer_integration',
+    'appsflyer_cost_etl_integration',
+    'event_backfill_job_table',
+    'datasource',
+    'store_itunes',
+    'store_google_play',
+    'user_history_materialized_column',
+    'event',
+    'schema',
+    'schema_parameter',
+    'atomic_parameter',
+    'event_context',
+]
+CONFIG_REVISION_LOCK_ID = 10001
+
+
+def upgrade() -> None:
+    op.execute('CREATE SEQUENCE config_revision_seq')
+    # Lock makes transactions take revisions in commit order, so once revision N is visible all smaller ones are too.
+    # Held only from first config write until commit, as sessions flush on commit.
+    op.execute(f'''
+CREATE FUNCTION set_config_revision() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock({CONFIG_REVISION_LOCK_ID});
+    NEW.revision := nextval('config_revision_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+    ''')
+
+    for table in TABLES:
+        op.add_column(table, sa.Column('revision', sa.BigInteger(), server_default=sa.text("nextval('config_revision_seq')"), nullable=False))
+        op.create_index(f'idx_{table}_revision', table, ['revision'], unique=False)
+        op.execute(f'CREATE TRIGGER trg_{table}_revision BEFORE INSERT OR UPDATE ON {table} FOR EACH ROW EXECUTE FUNCTION set_config_revision()')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER trg_{table}_revision ON {table}')
+        op.drop_index(f'idx_{table}_revision', table_name=table)
+        op.drop_column(table, 'revision')
+
+    op.execute('DROP FUNCTION set_config_revision()')
+    op.execute('DROP SEQUENCE config_revision_seq')
@@ -0,0 +1,35 @@
+"""Add non success status indexes
+
+Revision ID: 9d4b7e2c1a36
+Revises: 5c1f0e7a9b24
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9d4b7e2c1a36'
+down_revision = '5c1f0e7a9b24'
+branch_labels = None
+depends_on = None
+
+
+# keep in sync with orm.NON_SUCCESS_TABLES, maintainers query them with utils.not_success
+INDEXES = [
+    ('raw_schema', 'path'),
+    ('organization', 'id'),
+    ('app', 'id'),
+    ('event', 'id'),
+]
+
+
+def upgrade() -> None:
+    # only rows waiting for maintainers are indexed, so the indexes stay small and idle passes read nothing
+    for table, column in INDEXES:
+        op.create_index(f'idx_{table}_non_success', table, [column], unique=False, postgresql_where=sa.text("status <> 'SUCCESS'"))
+
+
+def downgrade() -> None:
+    for table, _ in INDEXES:
+        op.drop_index(f'idx_{table}_non_success', table_name=table)
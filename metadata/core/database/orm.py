@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Boolean, UniqueConstraint, ForeignKeyConstraint
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Boolean, UniqueConstraint, ForeignKeyConstraint, text
 from sqlalchemy.orm import registry, relationship, composite
 from sqlalchemy.dialects.postgresql import ARRAY, JSON
 
@@ -26,6 +26,14 @@ metadata = MetaData()
 mapper_registry = registry()
 
 
+def revision_column() -> Column:
+    """
+    Revision of last insert or update of the row, set by set_config_revision trigger from config_revision_seq.
+    Lets readers fetch only configuration that changed since revision they already have.
+    """
+    return Column("revision", BigInteger, server_default=text("nextval('config_revision_seq')"), nullable=False)
+
+
 organization_table = Table(
     "organization",
     metadata,
@@ -47,6 +55,7 @@ app_table = Table(
     Column("status", String, nullable=False),
     Column("status_updated_at", DateTime(timezone=True), nullable=False),
     Column("organization_id", Integer, ForeignKey("organization.id"), nullable=False),
+    revision_column(),
 )
 
 gcp_project_principal_table = Table(
@@ -65,6 +74,7 @@ appsflyer_integration_table = Table(
     Column("home_folder", String, nullable=False),
     Column("app_ids", ARRAY(String), nullable=False),
     Column("external_bucket_name", String, nullable=False),
+    revision_column(),
 )
 Index('idx_appsflyer_integration_app_id', appsflyer_integration_table.c.app_id, unique=True)
 
@@ -76,7 +86,8 @@ appsflyer_cost_etl_integration_table = Table(
     Column("bucket_name", String, nullable=False),
     Column("reports", ARRAY(String), nullable=False),
     Column("android_app_id", String, nullable=True),
-    Column("ios_app_id", String, nullable=True)
+    Column("ios_app_id", String, nullable=True),
+    revision_column(),
 )
 Index('idx_appsflyer_cost_etl_integration_app_id', appsflyer_cost_etl_integration_table.c.app_id, unique=True)
 
@@ -91,6 +102,7 @@ event_backfill_job_table = Table(
     Column("events", Boolean, nullable=False),
     Column("facts", Boolean, nullable=False),
     Column("user_history", Boolean, nullable=False),
+    revision_column(),
 )
 Index('idx_event_backfill_job_app_id_job_name', event_backfill_job_table.c.app_id, event_backfill_job_table.c.job_name, unique=True)
 
@@ -101,6 +113,7 @@ datasource_table = Table(
     Column("app_id", String, ForeignKey("app.id"), primary_key=True),
     Column("has_data_from", Date, nullable=False),
     Column("has_data_up_to", Date, nullable=True),
+    revision_column(),
 )
 
 raw_schema_table = Table(
@@ -122,6 +135,7 @@ schema_table = Table(
     Column("alias", String, nullable=True),
     Column("description", String, nullable=True),
     Column("created_at", DateTime(timezone=True), nullable=False),
+    revision_column(),
 
     UniqueConstraint('vendor', 'name', name='uq_schema_vendor_name')
 )
@@ -139,6 +153,7 @@ schema_parameter_table = Table(
     Column("is_gdpr", Boolean, nullable=False),
     Column("is_gdpr_updated_at", DateTime(timezone=True), nullable=True),
     Column("created_at", DateTime(timezone=True), nullable=False),
+    revision_column(),
 
     UniqueConstraint('schema_id', 'name', name='uq_schema_parameter_schema_name')
 )
@@ -153,6 +168,7 @@ atomic_parameter_table = Table(
     Column("is_gdpr", Boolean, nullable=False),
     Column("is_gdpr_updated_at", DateTime(timezone=True), nullable=True),
     Column("created_at", DateTime(timezone=True), nullable=False),
+    revision_column(),
 )
 
 event_context_table = Table(
@@ -163,6 +179,7 @@ event_context_table = Table(
     Column("embedded_in_event", Boolean, nullable=False),
     Column("status", String, nullable=False),
     Column("status_updated_at", DateTime(timezone=True), nullable=False),
+    revision_column(),
 )
 
 common_event_table = Table(
@@ -182,6 +199,7 @@ event_table = Table(
     Column("parent_common_event_version", Integer, nullable=True),
     Column("status", String, nullable=False),
     Column("status_updated_at", DateTime(timezone=True), nullable=False),
+    revision_column(),
 
     UniqueConstraint('app_id', 'parent_common_event_id', name='uq_event_app_id_parent_common_event_id')
 )
@@ -198,6 +216,7 @@ store_itunes_table = Table(
     Column("key_value", String, nullable=False),
     Column("vendor_number", String, nullable=False),
     Column("app_sku_id", String, nullable=False),
+    revision_column(),
 )
 Index('idx_store_itunes_apple_id', store_itunes_table.c.apple_id, unique=True)
 
@@ -209,6 +228,7 @@ store_google_play_table = Table(
     Column("app_bundle_id", String, nullable=False),
     Column("service_account", String, nullable=False),
     Column("report_bucket_name", String, nullable=False),
+    revision_column(),
 )
 
 user_history_materialized_column = Table(
@@ -228,11 +248,40 @@ user_history_materialized_column = Table(
     Column("materialized_from", DateTime(timezone=True), nullable=False),
     Column("hidden", Boolean, nullable=True, default=False),
     Column("dataset", String, nullable=False),
+    revision_column(),
 
     UniqueConstraint("column_name", "app_id", "datasource_id", name="uq_column_name_app_id_datasource_id"),
 )
 ForeignKeyConstraint(['datasource_id', 'app_id'], ['datasource.id', 'datasource.app_id'], table=user_history_materialized_column)
 
+CONFIG_REVISION_TABLES = [
+    app_table,
+    appsflyer_integration_table,
+    appsflyer_cost_etl_integration_table,
+    event_backfill_job_table,
+    datasource_table,
+    store_itunes_table,
+    store_google_play_table,
+    user_history_materialized_column,
+    event_table,
+    schema_table,
+    schema_parameter_table,
+    atomic_parameter_table,
+    event_context_table,
+]
+for _table in CONFIG_REVISION_TABLES:
+    Index(f'idx_{_table.name}_revision', _table.c.revision)
+
+# tables processed by maintainers, with partial indexes of rows they still have to process, see migration 9d4b7e2c1a36
+NON_SUCCESS_TABLES = [
+    raw_schema_table,
+    organization_table,
+    app_table,
+    event_table,
+]
+for _table in NON_SUCCESS_TABLES:
+    Index(f'idx_{_table.name}_non_success', *_table.primary_key.columns, postgresql_where=text("status <> 'SUCCESS'"))
+
 
 def init_orm_mappers():
     mapper_registry.map_imperatively(
@@ -242,7 +291,7 @@ def init_orm_mappers():
         properties={
             "_status": organization_table.c.status,
             "status": composite(Status, organization_table.c.status),
-            "gcp_project_principals": relationship(GcpProjectPrincipal, lazy='joined'),
+            "gcp_project_principals": relationship(GcpProjectPrincipal, lazy='selectin'),
         },
     )
 
@@ -260,8 +309,8 @@ def init_orm_mappers():
             "organization": relationship(Organization, uselist=False, lazy='joined'),
             "appsflyer_integration": relationship(AppsflyerIntegration, uselist=False, lazy='joined'),
             "appsflyer_cost_etl_integration": relationship(AppsflyerCostETLIntegration, uselist=False, lazy='joined'),
-            "event_backfill_jobs": relationship(EventBackfillJob, lazy='joined'),
-            "datasources": relationship(Datasource, lazy='joined'),
+            "event_backfill_jobs": relationship(EventBackfillJob, order_by=event_backfill_job_table.c.id, lazy='selectin'),
+            "datasources": relationship(Datasource, order_by=datasource_table.c.id, lazy='selectin'),
             "store_itunes": relationship(StoreITunes, uselist=False, lazy='joined'),
             "store_google_play": relationship(StoreGooglePlay, uselist=False, lazy='joined'),
         },
@@ -308,7 +357,7 @@ def init_orm_mappers():
         properties={
             "_app_id": datasource_table.c.app_id,
             "app_id": composite(AppId, datasource_table.c.app_id),
-            "materialized_columns": relationship(MaterializedColumn, lazy='joined'),
+            "materialized_columns": relationship(MaterializedColumn, order_by=user_history_materialized_column.c.id, lazy='selectin'),
         },
     )
 
@@ -325,7 +374,7 @@ def init_orm_mappers():
         Schema,
         schema_table,
         properties={
-            "parameters": relationship(SchemaParameter, order_by=schema_parameter_table.c.id, lazy='joined'),
+            "parameters": relationship(SchemaParameter, order_by=schema_parameter_table.c.id, lazy='selectin'),
         },
     )
 
@@ -13,11 +13,23 @@
 # limitations under the License.
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import literal_column, select, func
+from sqlalchemy.sql.elements import ColumnElement
+from metadata.core.domain.status import Status
 
 
 MAINTAINER_LOCK_ID = 10000
+# taken by set_config_revision trigger, see migration 5c1f0e7a9b24
+CONFIG_REVISION_LOCK_ID = 10001
 
 
 def maintainer_lock(session: Session):
     session.execute(select([func.pg_try_advisory_xact_lock(MAINTAINER_LOCK_ID)]))
+
+
+def not_success(status_column) -> ColumnElement:
+    """
+    Rows maintainers still have to process. Compared to a literal rather than a bound parameter,
+    so the planner can match it to the partial indexes of orm.NON_SUCCESS_TABLES.
+    """
+    return status_column != literal_column(f"'{Status.SUCCESS.value}'")
@@ -18,11 +18,13 @@ import random
 import string
 from typing import List, Tuple
 import pytz
-from metadata.core.domain.app_id import AppId
+from metadata.core.domain.app_id import AppId, event_vendor
 from metadata.core.domain.common import BaseEntity, EntityError
 from metadata.core.domain.status import Status
 from metadata.core.domain.user_history import MaterializedColumn
 
+CLOSE_EVENT_PARTITIONS_AFTER_HOURS = 4
+
 @dataclass(kw_only=True)
 class AppsflyerIntegration(BaseEntity):
     id: int | None = field(init=False, default=None)
@@ -197,9 +199,9 @@ class App(BaseEntity):
 
     @property
     def event_vendor(self):
-        return f'com.algebraai.gametuner.gamespecific.{self.id.value}'
+        return event_vendor(self.id)
 
     @property
     def close_event_partitions_after_hours(self) -> int:
-        return 4
+        return CLOSE_EVENT_PARTITIONS_AFTER_HOURS
 
@@ -26,4 +26,11 @@ class AppId:
             raise EntityError('App id must have all lowercase letters')
 
     def __composite_values__(self):
-        return (self.value,)
\ No newline at end of file
+        return (self.value,)
+
+
+def event_vendor(app_id: AppId) -> str:
+    """
+    Vendor of schemas of all events of an app.
+    """
+    return f'com.algebraai.gametuner.gamespecific.{app_id.value}'
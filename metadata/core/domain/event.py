@@ -18,13 +18,18 @@ import dataclasses
 from datetime import datetime
 from typing import List, Set, Tuple
 from metadata.core.domain.app import AppId
+from metadata.core.domain.app_id import event_vendor
 from metadata.core.domain.common import BaseEntity
 from metadata.core.domain.iglu import IgluSchema
-from metadata.core.domain.schema import ParameterType, Schema, SchemaParameter
+from metadata.core.domain.schema import ParameterType, Schema, SchemaParameter, default_alias
 from metadata.core.domain.status import Status
 from metadata.core.domain.common import EntityError
 
 
+def event_datasource_id(event_name: str) -> str:
+    return f'events_{event_name}'
+
+
 @dataclass(kw_only=True)
 class AtomicParameter(BaseEntity):
     name: str
@@ -40,7 +45,7 @@ class AtomicParameter(BaseEntity):
         return (self.name,)
 
     def get_alias(self) -> str:
-        return self.name.replace('_', ' ').title()
+        return default_alias(self.name)
 
 
 # TODO validation that parameters cant start with custom_
@@ -110,7 +115,7 @@ class EventContext(BaseEntity, IgluSchemaGenerator):
         return self.schema
 
     def get_alias(self) -> str:
-        return self.override_url_schema_name().replace('_', ' ').title()
+        return default_alias(self.override_url_schema_name())
 
 
 @dataclass(kw_only=True)
@@ -142,7 +147,7 @@ class Event(BaseEntity, IgluSchemaGenerator):
             app_id=app_id,
             schema=Schema(
                 parameters=[],
-                vendor=f"com.algebraai.gametuner.gamespecific.{app_id.value}",
+                vendor=event_vendor(app_id),
                 name=name,
                 alias=alias,
                 description=description
@@ -182,4 +187,4 @@ class Event(BaseEntity, IgluSchemaGenerator):
 
     @property
     def datasource_id(self) -> bool:
-        return f'events_{self.schema.name}'
+        return event_datasource_id(self.schema.name)
@@ -22,6 +22,13 @@ from metadata.core.domain.common import BaseEntity, EntityError
 from metadata.core.domain.status import Status
 
 
+def default_alias(name: str) -> str:
+    """
+    Alias shown for schemas and parameters that have none set.
+    """
+    return name.replace('_', ' ').title()
+
+
 class ParameterType(str, Enum):
     NUMBER = 'number'
     BOOLEAN = 'boolean'
@@ -91,9 +98,7 @@ class SchemaParameter(BaseEntity):
         return (self.id,)
 
     def get_alias(self) -> str:
-        if self.alias:
-            return self.alias
-        return self.name.replace('_', ' ').title()
+        return self.alias or default_alias(self.name)
 
 
 @dataclass(kw_only=True)
@@ -149,7 +154,5 @@ class Schema(BaseEntity):
         return self.current_version + 1
 
     def get_alias(self) -> str:
-        if self.alias:
-            return self.alias
-        return self.name.replace('_', ' ').title()
+        return self.alias or default_alias(self.name)
 
@@ -0,0 +1,70 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass
+from typing import Callable, ContextManager, List, Set
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from metadata.core.config_cache import config_cache, config_generation
+from metadata.core.domain.event import AtomicParameter, CommonEvent, EventContext
+
+
+@dataclass(frozen=True)
+class SystemCatalog:
+    """
+    Atomic parameters, event contexts and common events shared by all apps.
+    Entities are detached from the session they were loaded in, and are shared between threads, so they must not be modified.
+    """
+    atomic_parameters: List[AtomicParameter]
+    event_contexts: List[EventContext]
+    common_events: List[CommonEvent]
+
+    @property
+    def embedded_event_contexts(self) -> List[EventContext]:
+        return [c for c in self.event_contexts if c.embedded_in_event]
+
+    @property
+    def non_embedded_event_contexts(self) -> List[EventContext]:
+        return [c for c in self.event_contexts if not c.embedded_in_event]
+
+    def get_atomic_parameter_names(self) -> Set[str]:
+        return {atomic.name for atomic in self.atomic_parameters}
+
+
+def get_system_catalog(db_session: Callable[[], ContextManager[Session]]) -> SystemCatalog:
+    """
+    Returns catalog cached for current config generation, loading it only when outdated.
+    """
+    return config_cache.get_or_build('system-catalog', lambda: _load(db_session))
+
+
+async def get_system_catalog_async(db_session: Callable[[], ContextManager[Session]]) -> SystemCatalog:
+    """
+    Same as get_system_catalog, for async callers. Catalog that is up to date is returned right on the event loop,
+    outdated one is loaded in threadpool.
+    """
+    entry = config_cache.peek('system-catalog')
+    if entry is not None and entry.generation == config_generation.current():
+        return entry.value
+    return await run_in_threadpool(get_system_catalog, db_session)
+
+
+def _load(db_session: Callable[[], ContextManager[Session]]) -> SystemCatalog:
+    with db_session() as session:
+        return SystemCatalog(
+            atomic_parameters=session.scalars(select(AtomicParameter)).all(),
+            event_contexts=session.scalars(select(EventContext).order_by(EventContext.id)).unique().all(),
+            common_events=session.scalars(select(CommonEvent).order_by(CommonEvent.id)).unique().all(),
+        )
@@ -12,8 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Generator
+from typing import AsyncGenerator
 from metadata.core.database import connection
 
-def session_factory() -> Generator:
+# async, so resolving it does not take a threadpool worker for async routes
+async def session_factory() -> AsyncGenerator:
     yield connection.get_db_session
+
+
+async def read_session_factory() -> AsyncGenerator:
+    yield connection.get_read_db_session
+
+
+async def replica_session_factory() -> AsyncGenerator:
+    yield connection.get_replica_db_session
+
+
+async def async_session_factory() -> AsyncGenerator:
+    # None when async engine is not configured, then reads go through sync sessions
+    yield connection.get_async_db_session if connection.async_engine is not None else None
@@ -19,13 +19,20 @@ from fastapi.logger import logger
 from starlette.background import BackgroundTask
 from starlette.responses import StreamingResponse
 from fastapi.routing import APIRoute
-from typing import Callable
+from typing import AsyncIterator, Callable
 
 
 def log_info(duration, status, method, path, body):
     logger.info(f"Processed request in {duration:.2f}s - {method} {path} {status} {body}")
 
 
+async def logged_body_iterator(body_iterator: AsyncIterator, before: float, status, method, path, body) -> AsyncIterator:
+    # body is passed through untouched (it may be compressed or large), request is logged once it is fully sent
+    async for chunk in body_iterator:
+        yield chunk
+    log_info(time.time() - before, status, method, path, body)
+
+
 class LoggingRoute(APIRoute):
     def get_route_handler(self) -> Callable:
         original_route_handler = super().get_route_handler()
@@ -42,13 +49,9 @@ class LoggingRoute(APIRoute):
             duration = time.time() - before
 
             if isinstance(response, StreamingResponse):
-                res_body = b''
-                async for item in response.body_iterator:
-                    res_body += item
-
-                task = BackgroundTask(log_info, duration, response.status_code, request.method, request.url.path, req_body)
-                return Response(content=res_body, status_code=response.status_code,
-                                headers=dict(response.headers), media_type=response.media_type, background=task)
+                response.body_iterator = logged_body_iterator(response.body_iterator, before, response.status_code,
+                                                              request.method, request.url.path, req_body)
+                return response
             else:
                 response.background = BackgroundTask(log_info, duration, response.status_code, request.method, request.url.path, req_body)
                 return response
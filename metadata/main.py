@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import logging
+from anyio import to_thread
 from metadata.core.domain.common import EntityError, EntityNotFound
 from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
 from opentelemetry.sdk.trace import TracerProvider
@@ -22,14 +23,16 @@ from fastapi import FastAPI
 from fastapi.logger import logger
 from fastapi.responses import PlainTextResponse
 from metadata.config import settings
-from metadata.core.database import orm, connection
+from metadata.core.database import orm, connection, config_notifications
 from metadata import status_maintainer
 from metadata import monitoring
 from metadata.logging.setup_logging import setup_logging
 from metadata.logging.middleware import LoggingMiddleware
+from metadata.api.app import freshness_buffer
 from metadata.api.app.web import router as app_router
 from metadata.api.healthcheck.web import router as healthcheck_router
 from metadata.api.event.web import router as event_router
+from metadata.api.iglu.web import router as iglu_router
 
 
 app = FastAPI()
@@ -51,6 +54,7 @@ else:
 
 app.include_router(app_router)
 app.include_router(event_router)
+app.include_router(iglu_router)
 app.include_router(healthcheck_router)
 
 
@@ -63,7 +67,22 @@ async def entity_error_exception_handler(request, exc):
 async def entity_not_found_exception_handler(request, exc):
     return PlainTextResponse(str(exc), status_code=404)
 
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # database pool is sized by the same setting
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+
+
+@app.on_event("shutdown")
+def flush_datasource_freshness():
+    freshness_buffer.stop()
+
+
 orm.init_orm_mappers()
+config_notifications.start(connection.engine)
+if settings.DATASOURCE_FRESHNESS_FLUSH_SECONDS:
+    freshness_buffer.start(connection.get_db_session, settings.DATASOURCE_FRESHNESS_FLUSH_SECONDS)
 
 
 if settings.RUN_MAINTAINER == '1':
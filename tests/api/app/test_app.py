@@ -12,23 +12,65 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import threading
 import pytest
+from contextlib import asynccontextmanager, contextmanager
 from datetime import date
 
-from sqlalchemy import select
-from metadata.api.app.request import CreateAppDTO
+from sqlalchemy import event as sqlalchemy_event, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from metadata.api.app.request import CreateAppDTO, DatasourceFreshnessDTO
+from metadata.api.app.response import AllAppsConfigDTO, ConfigWatchDTO
+from metadata.api.app.web import apps_detailed_watch
+from metadata.api.snapshot import Snapshot
 from metadata.core.domain.app import App, AppId, Datasource, Timezone
+from metadata.api.app import service as app_service_module
 from metadata.api.app.service import AppService
+from metadata.core.config_cache import config_generation
 from metadata.core.domain.status import Status
-from metadata.core.domain.common import EntityError
+from metadata.core.domain.common import EntityError, EntityNotFound
+from metadata.api.event.request import CreateOrUpdateEventDTO
+from metadata.api.event.service import EventService
+from metadata.core.domain.event import Event
+from metadata.config import settings
+from metadata.core.database import connection
+from metadata.core.system_catalog import get_system_catalog
 
 
-def test_registering_new_app_should_correctly_initialize_it(session_factory, organization):
+@contextmanager
+def count_queries():
+    queries = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    sqlalchemy_event.listen(connection.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        sqlalchemy_event.remove(connection.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture()
+def async_session_factory(session_factory):
+    # connections are not shared between event loops of separate asyncio.run calls
+    async_engine = create_async_engine(make_url(settings.SQLALCHEMY_DATABASE_URL).set(drivername='postgresql+asyncpg'), poolclass=NullPool)
+
+    @asynccontextmanager
+    async def get_async_db_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+    return get_async_db_session
+
+
+def test_registering_new_app_should_correctly_initialize_it(session_factory, organization, fetch_app):
     app_service = AppService(session_factory)
     app_id = AppId('newapp')
     timezone = Timezone(name='Europe/Belgrade')
     app_service.register(CreateAppDTO(app_id.value, organization.name, timezone, date(2023, 6, 12)))
-    app = app_service.get_by_app_id(app_id)
+    app = fetch_app(app_id)
     assert app.id == app_id
     assert app.timezone == timezone
     assert len(app.api_key) > 0
@@ -37,7 +79,7 @@ def test_registering_new_app_should_correctly_initialize_it(session_factory, org
     # TODO check common events
 
 
-def test_get_all_success_apps_returns_only_sucess(session_factory, organization):
+def test_listed_apps_skip_not_ready_apps(session_factory, organization):
     app_service = AppService(session_factory)
     app_service.register(CreateAppDTO(AppId(value='appone').value, organization.name, Timezone(name='Europe/Belgrade'), date(2023, 6, 12)))
     app_service.register(CreateAppDTO(AppId(value='apptwo').value, organization.name, Timezone(name='Europe/Belgrade'), date(2023, 6, 12)))
@@ -45,7 +87,31 @@ def test_get_all_success_apps_returns_only_sucess(session_factory, organization)
         app: App = session.scalars(select(App).where(App.id == AppId(value='appone'))).unique().one()
         app.set_status(Status.SUCCESS)
         session.commit()
-    assert [app.id for app in app_service.get_all_success()] == [AppId(value='appone')]
+    assert [app.app_id for app in app_service.get_listed_apps()] == ['appone']
+
+
+def test_listed_apps_are_filtered_and_paged_by_id(session_factory, organization):
+    app_service = AppService(session_factory)
+    for app_id in ['appa', 'appb', 'appc', 'other']:
+        app_service.register(CreateAppDTO(app_id, organization.name))
+    with session_factory() as session:
+        for app in session.scalars(select(App)).unique().all():
+            app.set_status(Status.SUCCESS)
+        session.commit()
+
+    assert sorted(app.app_id for app in app_service.get_listed_apps()) == ['appa', 'appb', 'appc', 'other']
+    assert [app.app_id for app in app_service.get_listed_apps(None, 2, None, 'app')] == ['appa', 'appb']
+    assert [app.app_id for app in app_service.get_listed_apps('appb', 2, None, 'app')] == ['appc']
+    assert [app.app_id for app in app_service.get_listed_apps(None, None, Status.NEEDS_UPDATE, None)] == []
+
+
+def test_minimal_app_loads_no_related_entities(session_factory, organization):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('newapp', organization.name))
+    app = app_service.get_minimal_by_app_id(AppId('newapp'))
+    assert app.api_key
+    with pytest.raises(InvalidRequestError):
+        app.datasources
 
 
 def test_registering_duplicate_app_fails(session_factory, organization):
@@ -56,24 +122,314 @@ def test_registering_duplicate_app_fails(session_factory, organization):
         app_service.register(CreateAppDTO(app_id.value, organization.name))
 
 
-def test_updating_datasource_freshness_for_the_first_time_succeeds(session_factory, organization):
+def test_updating_datasource_freshness_for_the_first_time_succeeds(session_factory, organization, fetch_app):
     app_id = AppId('newapp')
     app_service = AppService(session_factory)
     app_service.register(CreateAppDTO(app_id.value, organization.name, has_data_from=date(2023, 6, 12)))
     updated_app = app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 14))
-    fetched_app = app_service.get_by_app_id(app_id)
+    fetched_app = fetch_app(app_id)
 
     assert updated_app.datasources == fetched_app.datasources
     assert fetched_app.get_datasource('new_ds') == Datasource(id='new_ds', app_id=app_id, has_data_from=date(2023, 6, 14), has_data_up_to=date(2023, 6, 14))
 
 
-def test_updating_existing_datasource_succeeds(session_factory, organization):
+def test_updating_existing_datasource_succeeds(session_factory, organization, fetch_app):
     app_id = AppId('newapp')
     app_service = AppService(session_factory)
     app_service.register(CreateAppDTO(app_id.value, organization.name, has_data_from=date(2023, 6, 12)))
     updated_app = app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 14))
     updated_app = app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 15))
-    fetched_app = app_service.get_by_app_id(app_id)
+    fetched_app = fetch_app(app_id)
 
     assert updated_app.datasources == fetched_app.datasources
     assert fetched_app.get_datasource('new_ds') == Datasource(id='new_ds', app_id=app_id, has_data_from=date(2023, 6, 14), has_data_up_to=date(2023, 6, 15))
+
+
+def test_updating_datasource_freshness_bumps_config_generation(session_factory, organization):
+    app_id = AppId('newapp')
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO(app_id.value, organization.name, has_data_from=date(2023, 6, 12)))
+    generation = config_generation.current()
+    app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 14))
+    assert config_generation.current() > generation
+
+
+def test_batch_freshness_update_only_moves_datasources_forward(session_factory, organization, fetch_app):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('appone', organization.name, has_data_from=date(2023, 6, 12)))
+    app_service.register(CreateAppDTO('apptwo', organization.name, has_data_from=date(2023, 6, 12)))
+    app_service.update_datasource_freshness(AppId('appone'), 'old_ds', date(2023, 6, 20))
+
+    generation = config_generation.current()
+    assert app_service.update_datasources_freshness([
+        DatasourceFreshnessDTO('appone', 'old_ds', date(2023, 6, 18)),
+        DatasourceFreshnessDTO('appone', 'new_ds', date(2023, 6, 14)),
+        DatasourceFreshnessDTO('appone', 'new_ds', date(2023, 6, 15)),
+        DatasourceFreshnessDTO('apptwo', 'new_ds', date(2023, 6, 16)),
+    ]) == 2
+    assert config_generation.current() > generation
+
+    appone, apptwo = fetch_app(AppId('appone')), fetch_app(AppId('apptwo'))
+    assert appone.get_datasource('old_ds').has_data_up_to == date(2023, 6, 20)
+    assert appone.get_datasource('new_ds') == Datasource(id='new_ds', app_id=AppId('appone'), has_data_from=date(2023, 6, 15), has_data_up_to=date(2023, 6, 15))
+    assert apptwo.get_datasource('new_ds').has_data_up_to == date(2023, 6, 16)
+
+    generation = config_generation.current()
+    assert app_service.update_datasources_freshness([DatasourceFreshnessDTO('apptwo', 'new_ds', date(2023, 6, 16))]) == 0
+    assert config_generation.current() == generation
+
+
+def test_batch_freshness_update_of_unknown_app_fails(session_factory, organization):
+    with pytest.raises(EntityNotFound):
+        AppService(session_factory).update_datasources_freshness([DatasourceFreshnessDTO('unknown', 'new_ds', date(2023, 6, 16))])
+
+
+def test_get_success_events_of_app_returns_only_events_of_that_app(session_factory, organization):
+    app_service = AppService(session_factory)
+    event_service = EventService(session_factory)
+    for app_id in [AppId('appone'), AppId('apptwo')]:
+        app_service.register(CreateAppDTO(app_id.value, organization.name))
+        event_service.create_or_update_event(app_id, CreateOrUpdateEventDTO(name=f'{app_id.value}_event'))
+    with session_factory() as session:
+        for app in session.scalars(select(App)).unique().all():
+            app.set_status(Status.SUCCESS)
+        for event in session.scalars(select(Event)).unique().all():
+            event.set_status(Status.SUCCESS)
+        session.commit()
+
+    events_by_app = app_service.get_success_events_of_app(AppId('appone'))
+    assert list(events_by_app.apps_by_id) == [AppId('appone')]
+    assert [e.get_schema().name for e in events_by_app.get_events(AppId('appone'))] == ['appone_event']
+
+
+def test_get_success_events_of_not_ready_app_fails(session_factory, organization):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('newapp', organization.name))
+    with pytest.raises(EntityNotFound):
+        app_service.get_success_events_of_app(AppId('newapp'))
+
+
+def test_config_changes_contain_only_apps_changed_since_generation(session_factory, organization):
+    app_service = AppService(session_factory)
+    for app_id in ['appone', 'apptwo']:
+        app_service.register(CreateAppDTO(app_id, organization.name))
+    with session_factory() as session:
+        for app in session.scalars(select(App)).unique().all():
+            app.set_status(Status.SUCCESS)
+        session.commit()
+
+    everything = app_service.get_config_changes_since(0)
+    assert {app.id.value for app in everything.apps} == {'appone', 'apptwo'}
+    assert everything.catalog_changed
+
+    app_service.update_datasource_freshness(AppId('apptwo'), 'user_history', date(2023, 6, 14))
+    changes = app_service.get_config_changes_since(everything.generation)
+    assert changes.generation > everything.generation
+    assert [app.id.value for app in changes.apps] == ['apptwo']
+    assert not changes.catalog_changed
+
+    assert app_service.get_config_changes_since(changes.generation).apps == []
+
+
+def test_fleet_config_query_count_does_not_depend_on_number_of_apps(session_factory, organization):
+    app_service = AppService(session_factory)
+    event_service = EventService(session_factory)
+
+    def add_success_apps(app_ids):
+        for app_id in app_ids:
+            app_service.register(CreateAppDTO(app_id, organization.name))
+            event_service.create_or_update_event(AppId(app_id), CreateOrUpdateEventDTO(name=f'{app_id}_event'))
+            app_service.update_datasource_freshness(AppId(app_id), 'new_ds', date(2023, 6, 14))
+        with session_factory() as session:
+            for app in session.scalars(select(App)).unique().all():
+                app.set_status(Status.SUCCESS)
+            for event in session.scalars(select(Event)).unique().all():
+                event.set_status(Status.SUCCESS)
+            session.commit()
+        # catalog is cached separately from the fleet config
+        get_system_catalog(session_factory)
+
+    add_success_apps(['appone'])
+    with count_queries() as queries_for_one_app:
+        app_service.get_fleet_config()
+
+    add_success_apps(['apptwo', 'appthree'])
+    with count_queries() as queries_for_three_apps:
+        fleet_config = app_service.get_fleet_config()
+
+    assert len(queries_for_three_apps) == len(queries_for_one_app)
+    assert len(fleet_config.apps) == 3
+    assert {app_id.value: [e.get_schema().name for e in events] for app_id, events in fleet_config.events_by_app.events_by_app.items()} == \
+        {'appone': ['appone_event'], 'apptwo': ['apptwo_event'], 'appthree': ['appthree_event']}
+
+
+def test_only_pure_reads_use_read_session(session_factory, organization):
+    read_sessions = []
+
+    @contextmanager
+    def read_session_factory():
+        read_sessions.append(1)
+        with session_factory() as session:
+            yield session
+
+    app_service = AppService(session_factory, read_session_factory)
+    app_service.register(CreateAppDTO('appone', organization.name))
+    app_service.update_datasource_freshness(AppId('appone'), 'new_ds', date(2023, 6, 14))
+    assert not read_sessions
+
+    assert app_service.get_minimal_by_app_id(AppId('appone')).id == AppId('appone')
+    app_service.get_fleet_config()
+    assert len(read_sessions) >= 2
+
+
+def test_repeated_datasource_freshness_does_not_bump_config_generation(session_factory, organization):
+    app_id = AppId('newapp')
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO(app_id.value, organization.name, has_data_from=date(2023, 6, 12)))
+    app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 14))
+    generation = config_generation.current()
+
+    app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 14))
+    app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 13))
+    assert config_generation.current() == generation
+
+    app_service.update_datasource_freshness(app_id, 'new_ds', date(2023, 6, 15))
+    assert config_generation.current() > generation
+
+
+def test_watch_returns_apps_detailed_etag_once_config_changes(session_factory, organization):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('appone', organization.name))
+    with session_factory() as session:
+        session.scalars(select(App)).unique().one().set_status(Status.SUCCESS)
+        session.commit()
+    config_generation.bump()
+
+    def watch(etag, timeout):
+        return asyncio.run(apps_detailed_watch(etag=etag, timeout=timeout, session_factory=session_factory,
+                                               read_session_factory=session_factory, async_session_factory=None))
+
+    first = watch(None, 0)
+    assert first.changed
+    assert not watch(first.etag, 0).changed
+    # change that does not touch config is not reported
+    config_generation.bump()
+    assert watch(first.etag, 0) == ConfigWatchDTO(etag=first.etag, changed=False)
+
+    timer = threading.Timer(0.2, app_service.update_datasource_freshness, (AppId('appone'), 'new_ds', date(2023, 6, 14)))
+    timer.start()
+    second = watch(first.etag, 10)
+    timer.join()
+    assert second.changed
+    assert second.etag != first.etag
+
+
+def test_fleet_config_etag_does_not_depend_on_row_order(session_factory, organization):
+    app_service = AppService(session_factory)
+    event_service = EventService(session_factory)
+    for app_id in ['appone', 'apptwo']:
+        app_service.register(CreateAppDTO(app_id, organization.name))
+        for name in ['first_event', 'second_event']:
+            event_service.create_or_update_event(AppId(app_id), CreateOrUpdateEventDTO(name=name))
+        for datasource_id in ['ds_b', 'ds_a']:
+            app_service.update_datasource_freshness(AppId(app_id), datasource_id, date(2023, 6, 14))
+    with session_factory() as session:
+        for app in session.scalars(select(App)).unique().all():
+            app.set_status(Status.SUCCESS)
+        for event in session.scalars(select(Event)).unique().all():
+            event.set_status(Status.SUCCESS)
+        session.commit()
+
+    def etag():
+        fleet_config = app_service.get_fleet_config()
+        return Snapshot.render(AllAppsConfigDTO.from_domain_model(fleet_config.apps, fleet_config.events_by_app)).etag
+
+    before = etag()
+    # updated rows move to the end of the table, so unordered reads return them in a different order
+    with session_factory() as session:
+        session.execute(text("UPDATE app SET timezone = timezone WHERE id = 'appone'"))
+        session.execute(text("UPDATE datasource SET has_data_from = has_data_from WHERE id = 'ds_b'"))
+        session.execute(text("UPDATE event SET app_id = app_id WHERE app_id = 'appone'"))
+        session.commit()
+    assert etag() == before
+
+
+def test_reads_and_writes_hold_single_session_while_loading_catalog(session_factory, organization):
+    open_sessions = []
+    most_open_sessions = []
+
+    @contextmanager
+    def counting_session_factory():
+        open_sessions.append(1)
+        most_open_sessions.append(len(open_sessions))
+        try:
+            with session_factory() as session:
+                yield session
+        finally:
+            open_sessions.pop()
+
+    app_service = AppService(counting_session_factory)
+    app_service.register(CreateAppDTO('appone', organization.name))
+    with session_factory() as session:
+        session.scalars(select(App)).unique().one().set_status(Status.SUCCESS)
+        session.commit()
+    for read in [app_service.get_fleet_config, lambda: app_service.get_success_events_of_app(AppId('appone')),
+                 lambda: app_service.get_config_changes_since(0),
+                 lambda: EventService(counting_session_factory).create_or_update_event(AppId('appone'), CreateOrUpdateEventDTO(name='new_event'))]:
+        # catalog cache miss
+        config_generation.bump()
+        read()
+    assert max(most_open_sessions) == 1
+
+
+def test_batch_freshness_update_is_written_in_chunks(session_factory, organization, fetch_app, monkeypatch):
+    monkeypatch.setattr(app_service_module, 'FRESHNESS_UPSERT_CHUNK_SIZE', 2)
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('appone', organization.name, has_data_from=date(2023, 6, 12)))
+    app_service.register(CreateAppDTO('apptwo', organization.name, has_data_from=date(2023, 6, 12)))
+    updates = [DatasourceFreshnessDTO(app_id, f'ds_{index}', date(2023, 6, 14)) for app_id in ['appone', 'apptwo'] for index in range(3)]
+
+    with count_queries() as queries:
+        assert app_service.update_datasources_freshness(updates) == 6
+    assert len([query for query in queries if query.startswith('INSERT INTO datasource')]) == 3
+    assert {ds.id for ds in fetch_app(AppId('apptwo')).datasources} >= {'ds_0', 'ds_1', 'ds_2'}
+
+
+def test_async_reads_return_same_apps_and_fleet_config_as_sync_reads(session_factory, async_session_factory, organization):
+    app_service = AppService(session_factory, async_read_db_session=async_session_factory)
+    event_service = EventService(session_factory)
+    for app_id in ['appone', 'apptwo', 'other']:
+        app_service.register(CreateAppDTO(app_id, organization.name))
+        event_service.create_or_update_event(AppId(app_id), CreateOrUpdateEventDTO(name='first_event'))
+        app_service.update_datasource_freshness(AppId(app_id), 'ds', date(2023, 6, 14))
+    with session_factory() as session:
+        for app in session.scalars(select(App)).unique().all():
+            app.set_status(Status.SUCCESS)
+        for event in session.scalars(select(Event)).unique().all():
+            event.set_status(Status.SUCCESS)
+        session.commit()
+
+    assert asyncio.run(app_service.get_listed_apps_async()) == app_service.get_listed_apps()
+    assert asyncio.run(app_service.get_listed_apps_async('appone', 1, None, 'app')) == app_service.get_listed_apps('appone', 1, None, 'app')
+
+    def etag(fleet_config):
+        return Snapshot.render(AllAppsConfigDTO.from_domain_model(fleet_config.apps, fleet_config.events_by_app)).etag
+    assert etag(asyncio.run(app_service.get_fleet_config_async())) == etag(app_service.get_fleet_config())
+
+
+def test_watch_builds_apps_detailed_through_async_session(session_factory, async_session_factory, organization):
+    AppService(session_factory).register(CreateAppDTO('appone', organization.name))
+    with session_factory() as session:
+        session.scalars(select(App)).unique().one().set_status(Status.SUCCESS)
+        session.commit()
+    config_generation.bump()
+
+    with count_queries() as queries:
+        watched = asyncio.run(apps_detailed_watch(etag=None, timeout=0, session_factory=session_factory,
+                                                  read_session_factory=session_factory,
+                                                  async_session_factory=async_session_factory))
+    assert watched.changed
+    # only system catalog is loaded through sync engine
+    assert not any('FROM app' in query for query in queries)
+    fleet_config = AppService(session_factory).get_fleet_config()
+    assert watched.etag == Snapshot.render(AllAppsConfigDTO.from_domain_model(fleet_config.apps, fleet_config.events_by_app)).etag
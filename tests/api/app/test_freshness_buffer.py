@@ -0,0 +1,101 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+from datetime import date
+from sqlalchemy.exc import OperationalError
+from metadata.api.app import freshness_buffer
+from metadata.api.app.freshness_buffer import FreshnessBuffer
+from metadata.api.app.request import CreateAppDTO
+from metadata.api.app.service import AppService
+from metadata.core.domain.app import AppId
+
+
+def test_buffered_updates_are_coalesced_to_latest_date(session_factory, organization, fetch_app):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('newapp', organization.name, has_data_from=date(2023, 6, 12)))
+    buffer = FreshnessBuffer(session_factory)
+    buffer.add('newapp', 'new_ds', date(2023, 6, 15))
+    buffer.add('newapp', 'new_ds', date(2023, 6, 14))
+    assert fetch_app(AppId('newapp')).get_datasource('new_ds') is None
+
+    buffer.flush()
+    datasource = fetch_app(AppId('newapp')).get_datasource('new_ds')
+    assert datasource.has_data_from == date(2023, 6, 15)
+    assert datasource.has_data_up_to == date(2023, 6, 15)
+
+
+def test_update_of_unknown_app_does_not_drop_other_updates(session_factory, organization, fetch_app):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('newapp', organization.name, has_data_from=date(2023, 6, 12)))
+    buffer = FreshnessBuffer(session_factory)
+    buffer.add('unknown', 'new_ds', date(2023, 6, 15))
+    buffer.add('newapp', 'new_ds', date(2023, 6, 16))
+
+    buffer.flush()
+    assert fetch_app(AppId('newapp')).get_datasource('new_ds').has_data_up_to == date(2023, 6, 16)
+
+
+def test_failed_write_of_single_update_is_kept_for_next_flush(session_factory, organization, fetch_app, monkeypatch):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('appone', organization.name, has_data_from=date(2023, 6, 12)))
+    app_service.register(CreateAppDTO('apptwo', organization.name, has_data_from=date(2023, 6, 12)))
+    buffer = FreshnessBuffer(session_factory)
+    buffer.add('unknown', 'new_ds', date(2023, 6, 15))
+    buffer.add('appone', 'new_ds', date(2023, 6, 16))
+    buffer.add('apptwo', 'new_ds', date(2023, 6, 17))
+
+    update_datasources_freshness = AppService.update_datasources_freshness
+    def update_failing_for_appone(self, updates):
+        if len(updates) == 1 and updates[0].app_id == 'appone':
+            raise OperationalError('INSERT', {}, Exception('connection reset'))
+        return update_datasources_freshness(self, updates)
+
+    monkeypatch.setattr(AppService, 'update_datasources_freshness', update_failing_for_appone)
+    buffer.flush()
+    assert fetch_app(AppId('apptwo')).get_datasource('new_ds').has_data_up_to == date(2023, 6, 17)
+    assert fetch_app(AppId('appone')).get_datasource('new_ds') is None
+
+    monkeypatch.setattr(AppService, 'update_datasources_freshness', update_datasources_freshness)
+    buffer.flush()
+    assert fetch_app(AppId('appone')).get_datasource('new_ds').has_data_up_to == date(2023, 6, 16)
+
+
+def test_stop_waits_for_running_flush_and_writes_the_rest(session_factory, organization, fetch_app, monkeypatch):
+    app_service = AppService(session_factory)
+    app_service.register(CreateAppDTO('newapp', organization.name, has_data_from=date(2023, 6, 12)))
+    running = []
+    overlapping = []
+    update_datasources_freshness = AppService.update_datasources_freshness
+    def slow_update(self, updates):
+        overlapping.append(len(running))
+        running.append(1)
+        time.sleep(0.2)
+        running.pop()
+        return update_datasources_freshness(self, updates)
+
+    monkeypatch.setattr(AppService, 'update_datasources_freshness', slow_update)
+    # module state is restored after the test
+    monkeypatch.setattr(freshness_buffer, '_buffer', None)
+    monkeypatch.setattr(freshness_buffer, '_flusher_thread', None)
+    freshness_buffer.start(session_factory, 0.05)
+    freshness_buffer.add('newapp', 'first_ds', date(2023, 6, 15))
+    time.sleep(0.1)
+    # periodic flush is writing first update now
+    freshness_buffer.add('newapp', 'second_ds', date(2023, 6, 16))
+    freshness_buffer.stop()
+
+    app = fetch_app(AppId('newapp'))
+    assert app.get_datasource('first_ds').has_data_up_to == date(2023, 6, 15)
+    assert app.get_datasource('second_ds').has_data_up_to == date(2023, 6, 16)
+    assert set(overlapping) == {0}
@@ -128,4 +128,46 @@ def test_updating_event_metadata(session_factory, app):
     assert db_event.get_schema().parameters[0].type == ParameterType.STRING
     assert db_event.get_schema().parameters[0].is_gdpr is True
     assert db_event.get_schema().parameters[0].description == 'desc_param'
-    assert db_event.get_schema().parameters[0].introduced_at_version == 0
\ No newline at end of file
+    assert db_event.get_schema().parameters[0].introduced_at_version == 0
+
+def test_event_views_are_ordered_and_paged_by_name(session_factory, app):
+    event_service = EventService(session_factory)
+    for name in ['event_c', 'event_a', 'other', 'event_b']:
+        event_service.create_or_update_event(app.id, CreateOrUpdateEventDTO(name=name))
+
+    assert [e.name for e in event_service.get_all_event_views(app.id).events] == ['event_a', 'event_b', 'event_c', 'other']
+    assert [e.name for e in event_service.get_all_event_views(app.id, limit=2, prefix='event_').events] == ['event_a', 'event_b']
+    assert [e.name for e in event_service.get_all_event_views(app.id, after='event_b', limit=2, prefix='event_').events] == ['event_c']
+
+
+def test_bulk_creates_and_updates_events_in_one_transaction(session_factory, app):
+    event_service = EventService(session_factory)
+    event_service.create_or_update_event(app.id, CreateOrUpdateEventDTO(name='existing'))
+
+    results = event_service.create_or_update_events(app.id, [
+        CreateOrUpdateEventDTO(name='existing', description='updated', new_parameters=[
+            CreateParameterDTO(name='param', type=ParameterType.STRING, introduced_at_version=1)]),
+        CreateOrUpdateEventDTO(name='new_event', new_parameters=[
+            CreateParameterDTO(name='param', type=ParameterType.INTEGER, introduced_at_version=0)]),
+    ])
+
+    assert [(result.name, result.error) for result in results] == [('existing', None), ('new_event', None)]
+    existing = event_service.get_event_by_name(app.id, 'existing')
+    assert existing.description == 'updated'
+    assert [p.name for p in existing.parameters] == ['param']
+    assert [p.type for p in event_service.get_event_by_name(app.id, 'new_event').parameters] == [ParameterType.INTEGER]
+
+
+def test_bulk_applies_nothing_when_any_event_is_invalid(session_factory, app):
+    event_service = EventService(session_factory)
+    results = event_service.create_or_update_events(app.id, [
+        CreateOrUpdateEventDTO(name='valid'),
+        CreateOrUpdateEventDTO(name='wrong_version', new_parameters=[
+            CreateParameterDTO(name='param', type=ParameterType.STRING, introduced_at_version=3)]),
+        CreateOrUpdateEventDTO(name='valid'),
+    ])
+
+    assert results[0].error is None
+    assert results[1].error == 'Invalid version 3, expected 0'
+    assert results[2].error == 'Event valid is listed more than once'
+    assert event_service.get_all_event_views(app.id).events == []
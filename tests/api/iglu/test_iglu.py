@@ -0,0 +1,62 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import date
+import pytest
+from sqlalchemy import select
+from metadata.api.app.request import CreateAppDTO
+from metadata.api.app.service import AppService
+from metadata.api.event.request import CreateOrUpdateEventDTO, CreateParameterDTO
+from metadata.api.event.service import EventService
+from metadata.api.iglu.service import IgluService
+from metadata.core.domain.app import AppId
+from metadata.core.domain.common import EntityNotFound
+from metadata.core.domain.event import EventContext
+from metadata.core.domain.schema import ParameterType, RawSchema
+
+
+@pytest.fixture
+def app(session_factory, organization):
+    return AppService(session_factory).register(CreateAppDTO(AppId('newapp').value, organization.name, has_data_from=date(2023, 6, 12)))
+
+
+def test_event_schema_is_resolved_for_each_version(session_factory, app):
+    EventService(session_factory).create_or_update_event(app.id, CreateOrUpdateEventDTO(
+        name='event',
+        new_parameters=[CreateParameterDTO(name='param', type=ParameterType.STRING, is_gdpr=False, introduced_at_version=0)]
+    ))
+    EventService(session_factory).create_or_update_event(app.id, CreateOrUpdateEventDTO(
+        name='event',
+        new_parameters=[CreateParameterDTO(name='param1', type=ParameterType.BOOLEAN, is_gdpr=False, introduced_at_version=1)]
+    ))
+
+    iglu_service = IgluService(session_factory)
+    assert iglu_service.get_schema(app.event_vendor, 'event', '1-0-0').schema['properties'].keys() == {'param'}
+    assert iglu_service.get_schema(app.event_vendor, 'event', '1-0-1').schema['properties'].keys() == {'param', 'param1'}
+    with pytest.raises(EntityNotFound):
+        iglu_service.get_schema(app.event_vendor, 'event', '1-0-2')
+
+
+def test_context_and_raw_schemas_are_resolved(session_factory):
+    with session_factory() as session:
+        raw_schema: RawSchema = session.scalars(select(RawSchema)).first()
+        context: EventContext = session.scalars(select(EventContext)).unique().first()
+
+    iglu_service = IgluService(session_factory)
+    vendor, name, _, version = raw_schema.path.split('/')
+    assert iglu_service.get_schema(vendor, name, version).schema == raw_schema.schema
+
+    context_schema = context.to_iglu_schemas()[0]
+    vendor, name, _, version = context_schema.path.split('/')
+    assert iglu_service.get_schema(vendor, name, version) == context_schema
@@ -0,0 +1,149 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import gzip
+import os
+import pytest
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+from metadata.api.snapshot import Snapshot, accepts_gzip, etag_matches, load_snapshot, snapshot_response, snapshot_response_async, store_snapshot
+from metadata.config import settings
+from metadata.core.config_cache import config_cache, config_generation
+
+
+def test_snapshot_etag_depends_on_content():
+    assert Snapshot.render({'a': 1}).etag == Snapshot.render({'a': 1}).etag
+    assert Snapshot.render({'a': 1}).etag != Snapshot.render({'a': 2}).etag
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ('', False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", "abc"', True),
+    ('*', True),
+    ('"other"', False),
+    ('abc', False),
+])
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, '"abc"') is matches
+
+
+def test_snapshot_compresses_only_large_content():
+    assert Snapshot.render({'a': 1}).gzip_body is None
+
+    snapshot = Snapshot.render({'a': 'x' * 2000})
+    assert gzip.decompress(snapshot.gzip_body) == snapshot.body
+    assert len(snapshot.gzip_body) < len(snapshot.body)
+
+
+@pytest.mark.parametrize("accept_encoding, accepts", [
+    (None, False),
+    ('', False),
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('br;q=1.0, gzip;q=0.8', True),
+    ('*', True),
+    ('gzip;q=0', False),
+    ('identity', False),
+])
+def test_accepts_gzip(accept_encoding, accepts):
+    assert accepts_gzip(accept_encoding) is accepts
+
+
+def test_stored_snapshot_is_loaded_as_outdated_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'SNAPSHOT_DIR', str(tmp_path))
+    snapshot = Snapshot.render({'a': 1})
+    store_snapshot('apps/some/events', snapshot)
+
+    entry = load_snapshot('apps/some/events')
+    assert entry.value == snapshot
+    assert entry.generation == -1
+    assert load_snapshot('apps/other/events') is None
+
+
+def test_failed_store_leaves_no_temporary_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'SNAPSHOT_DIR', str(tmp_path))
+
+    def failing_replace(src, dst):
+        raise PermissionError(dst)
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    store_snapshot('apps-detailed', Snapshot.render({'a': 1}))
+    assert os.listdir(tmp_path) == []
+
+
+def test_unreadable_snapshot_is_not_loaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'SNAPSHOT_DIR', str(tmp_path))
+    # directory in place of the file cannot be read
+    os.makedirs(tmp_path / 'apps-detailed.json')
+    assert load_snapshot('apps-detailed') is None
+
+
+def test_stored_snapshot_is_served_when_database_is_unavailable(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'SNAPSHOT_DIR', str(tmp_path))
+    config_cache.clear()
+    store_snapshot('apps-detailed', Snapshot.render({'a': 1}))
+
+    def build():
+        raise OperationalError('SELECT 1', {}, Exception('connection refused'))
+
+    response = snapshot_response(Request({'type': 'http', 'headers': []}), 'apps-detailed', build, persist=True)
+    assert response.body == b'{"a":1}'
+    assert 'age' in response.headers
+    config_cache.clear()
+
+
+def test_async_snapshot_response_builds_only_when_outdated():
+    config_cache.clear()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {'a': len(builds)}
+
+    def respond():
+        return asyncio.run(snapshot_response_async(Request({'type': 'http', 'headers': []}), 'apps', build))
+
+    assert respond().body == b'{"a":1}'
+    assert respond().body == b'{"a":1}'
+    config_generation.bump()
+    assert respond().body == b'{"a":2}'
+    assert len(builds) == 2
+    config_cache.clear()
+
+
+def test_gzip_representation_has_its_own_etag():
+    config_cache.clear()
+
+    def build():
+        return {'a': 'x' * 2000}
+
+    def respond(headers):
+        request = Request({'type': 'http', 'headers': [(name.encode(), value.encode()) for name, value in headers.items()]})
+        return snapshot_response(request, 'apps', build)
+
+    identity = respond({})
+    gzipped = respond({'accept-encoding': 'gzip'})
+    assert gzipped.headers['content-encoding'] == 'gzip'
+    assert gzipped.headers['etag'] != identity.headers['etag']
+
+    # either tag tells the client it is up to date, 304 carries tag of the representation it would get
+    not_modified = respond({'accept-encoding': 'gzip', 'if-none-match': identity.headers['etag']})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['etag'] == gzipped.headers['etag']
+    assert respond({'if-none-match': gzipped.headers['etag']}).status_code == 304
+    config_cache.clear()
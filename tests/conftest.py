@@ -14,9 +14,11 @@
 
 import alembic.config
 import pytest
+from sqlalchemy import select
 from metadata.core.database import orm
 from metadata.core.database import connection
-from metadata.core.domain.app import Organization
+from metadata.core.config_cache import config_cache
+from metadata.core.domain.app import App, AppId, Organization
 
 ORM_INITIATED = False
 
@@ -24,6 +26,7 @@ ORM_INITIATED = False
 def setup_db():
     alembic.config.main(argv=['downgrade', 'base'])
     alembic.config.main(argv=['upgrade', 'head'])
+    config_cache.clear()
 
     global ORM_INITIATED
     if not ORM_INITIATED:
@@ -46,3 +49,11 @@ def organization(session_factory):
         session.add(org)
         session.commit()
     return org
+
+
+@pytest.fixture()
+def fetch_app(session_factory):
+    def fetch(app_id: AppId) -> App:
+        with session_factory() as session:
+            return session.scalars(select(App).where(App.id == app_id)).unique().one()
+    return fetch
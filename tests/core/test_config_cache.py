@@ -0,0 +1,200 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+import pytest
+from metadata.core.config_cache import ConfigCache, ConfigGeneration
+
+
+def test_cached_value_is_reused_within_generation():
+    cache = ConfigCache(ConfigGeneration())
+    builds = []
+    cache.get_or_build('key', lambda: builds.append(1) or len(builds))
+    assert cache.get_or_build('key', lambda: builds.append(1) or len(builds)) == 1
+    assert len(builds) == 1
+
+
+def test_bumping_generation_rebuilds_value():
+    generation = ConfigGeneration()
+    cache = ConfigCache(generation)
+    cache.get_or_build('key', lambda: 'old')
+    generation.bump()
+    assert cache.get_or_build('key', lambda: 'new') == 'new'
+
+
+def test_write_during_build_leaves_value_outdated():
+    generation = ConfigGeneration()
+    cache = ConfigCache(generation)
+
+    def build_while_writing():
+        generation.bump()
+        return 'built'
+
+    assert cache.get_or_build('key', build_while_writing) == 'built'
+    assert cache.get_or_build('key', lambda: 'rebuilt') == 'rebuilt'
+
+
+def test_concurrent_requests_share_single_build():
+    cache = ConfigCache(ConfigGeneration())
+    builds = []
+
+    def slow_build():
+        builds.append(1)
+        time.sleep(0.1)
+        return 'built'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(executor.map(lambda _: cache.get_or_build('key', slow_build), range(8)))
+    assert values == ['built'] * 8
+    assert len(builds) == 1
+
+
+def test_concurrent_async_requests_share_single_build():
+    cache = ConfigCache(ConfigGeneration())
+    builds = []
+
+    async def slow_build():
+        builds.append(1)
+        await asyncio.sleep(0.1)
+        return 'built'
+
+    async def requests():
+        return await asyncio.gather(*[cache.get_or_build_async('key', slow_build) for _ in range(8)])
+
+    assert asyncio.run(requests()) == ['built'] * 8
+    assert len(builds) == 1
+
+
+def test_request_after_change_waits_for_running_build_instead_of_starting_another():
+    generation = ConfigGeneration()
+    cache = ConfigCache(generation)
+    running = []
+    overlapping = []
+
+    def slow_build():
+        overlapping.append(len(running))
+        running.append(1)
+        time.sleep(0.1)
+        running.pop()
+        return generation.current()
+
+    first = Thread(target=cache.get_or_build, args=('key', slow_build))
+    first.start()
+    time.sleep(0.02)
+    generation.bump()
+    # sees the change, so it is built once more after the running build
+    assert cache.get_or_build('key', slow_build) == 1
+    first.join()
+    assert overlapping == [0, 0]
+
+
+def test_failed_build_is_not_cached():
+    cache = ConfigCache(ConfigGeneration())
+
+    def failing_build():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        cache.get_or_build('key', failing_build)
+    assert cache.get_or_build('key', lambda: 'built') == 'built'
+
+
+def test_outdated_entry_is_served_while_rebuilt_in_background():
+    generation = ConfigGeneration()
+    cache = ConfigCache(generation)
+    assert cache.get_or_revalidate('key', lambda: 'old', ttl_seconds=60).value == 'old'
+
+    generation.bump()
+    assert cache.get_or_revalidate('key', lambda: 'new', ttl_seconds=60).value == 'old'
+    deadline = time.monotonic() + 5
+    while cache.get_or_revalidate('key', lambda: 'newer', ttl_seconds=60).value != 'new' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_revalidate('key', lambda: 'newer', ttl_seconds=60).value == 'new'
+
+
+def test_entry_older_than_ttl_is_rebuilt_in_background():
+    cache = ConfigCache(ConfigGeneration())
+    cache.get_or_revalidate('key', lambda: 'old', ttl_seconds=0)
+    deadline = time.monotonic() + 5
+    while cache.get_or_revalidate('key', lambda: 'new', ttl_seconds=0).value != 'new' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_revalidate('key', lambda: 'new', ttl_seconds=0).value == 'new'
+
+
+def test_changes_during_background_rebuild_start_single_follow_up_rebuild():
+    generation = ConfigGeneration()
+    cache = ConfigCache(generation)
+    cache.get_or_revalidate('key', lambda: 'old', ttl_seconds=60)
+    running = []
+    overlapping = []
+
+    def slow_build():
+        overlapping.append(len(running))
+        running.append(1)
+        time.sleep(0.1)
+        running.pop()
+        return generation.current()
+
+    generation.bump()
+    for _ in range(5):
+        assert cache.get_or_revalidate('key', slow_build, ttl_seconds=60).value == 'old'
+        generation.bump()
+        time.sleep(0.01)
+
+    deadline = time.monotonic() + 5
+    while cache.peek('key').value != 6 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.peek('key').value == 6
+    assert overlapping == [0, 0]
+
+
+def test_waiting_for_change_wakes_up_on_bump_from_other_thread():
+    generation = ConfigGeneration()
+
+    async def watch():
+        waiting = asyncio.create_task(generation.wait_for_change(0, timeout=5))
+        await asyncio.sleep(0.01)
+        Thread(target=generation.bump).start()
+        return await waiting
+
+    assert asyncio.run(watch()) == 1
+
+
+def test_waiting_for_change_returns_same_generation_on_timeout():
+    generation = ConfigGeneration()
+    assert asyncio.run(generation.wait_for_change(0, timeout=0.01)) == 0
+
+
+def test_waiting_for_outdated_generation_returns_immediately():
+    generation = ConfigGeneration()
+    generation.bump()
+    assert asyncio.run(generation.wait_for_change(0, timeout=5)) == 1
+
+
+def test_outdated_entries_are_dropped_once_newer_generation_is_built():
+    generation = ConfigGeneration()
+    cache = ConfigCache(generation)
+    cache.get_or_build('apps/one', lambda: 'one')
+    cache.get_or_build('apps/two', lambda: 'two')
+    cache.get_or_revalidate('fleet', lambda: 'fleet', ttl_seconds=60)
+
+    generation.bump()
+    cache.get_or_build('apps/one', lambda: 'new one')
+    assert cache.peek('apps/one').value == 'new one'
+    assert cache.peek('apps/two') is None
+    # served while outdated, so it is kept until rebuilt
+    assert cache.peek('fleet').value == 'fleet'
@@ -0,0 +1,92 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from metadata.core.config_cache import config_generation
+from metadata.core.database import config_notifications
+
+
+def test_only_notifications_from_other_replicas_bump_generation(monkeypatch):
+    monkeypatch.setattr(config_notifications, 'track_change_lsn', True)
+    monkeypatch.setattr(config_notifications, '_change_lsn', None)
+    generation = config_generation.current()
+    config_notifications._handle([config_notifications.SENDER_ID], lambda: '0/10')
+    assert config_generation.current() == generation
+    assert config_notifications.latest_change_lsn() is None
+
+    config_notifications._handle([config_notifications.SENDER_ID, 'other'], lambda: '0/10')
+    assert config_generation.current() == generation + 1
+    assert config_notifications.latest_change_lsn() == '0/10'
+
+
+def test_latest_change_lsn_only_moves_forward_until_replayed(monkeypatch):
+    monkeypatch.setattr(config_notifications, '_change_lsn', None)
+    config_notifications.record_change_lsn('1/A0')
+    config_notifications.record_change_lsn('0/FF')
+    assert config_notifications.latest_change_lsn() == '1/A0'
+
+    # replay of an older position does not forget newer change
+    config_notifications.change_replayed('0/FF')
+    assert config_notifications.latest_change_lsn() == '1/A0'
+    config_notifications.change_replayed('1/A0')
+    assert config_notifications.latest_change_lsn() is None
+
+
+def test_failed_config_commit_does_not_bump_generation():
+    class FailingSession:
+        executed = []
+
+        def execute(self, statement):
+            self.executed.append(statement)
+
+        def commit(self):
+            raise IntegrityError('INSERT', {}, Exception('duplicate key'))
+
+    generation = config_generation.current()
+    with pytest.raises(IntegrityError):
+        config_notifications.commit_config_change(FailingSession())
+    assert FailingSession.executed
+    assert config_generation.current() == generation
+
+
+class CommittingSession:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, statement):
+        self.executed.append(statement)
+
+    def commit(self):
+        pass
+
+    def scalar(self, statement):
+        raise OperationalError('SELECT', {}, Exception('connection reset'))
+
+
+def test_config_commit_reads_wal_position_only_with_read_replica(monkeypatch):
+    monkeypatch.setattr(config_notifications, 'track_change_lsn', False)
+    monkeypatch.setattr(CommittingSession, 'scalar', lambda self, statement: pytest.fail('WAL position read'))
+    generation = config_generation.current()
+    config_notifications.commit_config_change(CommittingSession())
+    assert config_generation.current() == generation + 1
+
+
+def test_failed_wal_position_read_still_bumps_generation(monkeypatch):
+    monkeypatch.setattr(config_notifications, 'track_change_lsn', True)
+    monkeypatch.setattr(config_notifications, '_change_lsn', None)
+    generation = config_generation.current()
+    config_notifications.commit_config_change(CommittingSession())
+    assert config_generation.current() == generation + 1
+    assert config_notifications.latest_change_lsn() is None
@@ -0,0 +1,55 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from sqlalchemy import create_engine, event, text
+from metadata.config import settings
+from metadata.core.database import config_notifications, connection
+from metadata.core.database.connection import InstrumentedQueuePool, set_statement_timeout
+
+
+def test_statement_timeout_survives_return_to_pool(monkeypatch):
+    monkeypatch.setattr(settings, 'DB_STATEMENT_TIMEOUT_MS', 1500)
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0)
+    event.listen(engine, 'connect', set_statement_timeout)
+    try:
+        for _ in range(2):
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql('SHOW statement_timeout').scalar() == '1500ms'
+    finally:
+        engine.dispose()
+
+
+def test_server_that_is_not_a_replica_has_replayed_everything():
+    with connection.engine.connect() as conn:
+        lsn = conn.execute(text('SELECT pg_current_wal_lsn()')).scalar()
+        assert connection.replica_has_replayed(conn, lsn)
+
+
+def test_read_session_waits_for_replica_only_after_config_change(monkeypatch):
+    monkeypatch.setattr(connection, 'has_read_replica', True)
+    monkeypatch.setattr(config_notifications, '_change_lsn', None)
+    waits = []
+    wait_for_replica = connection._wait_for_replica
+    monkeypatch.setattr(connection, '_wait_for_replica', lambda lsn: waits.append(lsn) or wait_for_replica(lsn))
+
+    with connection.get_read_db_session() as session:
+        session.execute(text('SELECT 1'))
+    assert waits == []
+
+    with connection.engine.connect() as conn:
+        lsn = conn.execute(text('SELECT pg_current_wal_lsn()::text')).scalar()
+    config_notifications.record_change_lsn(lsn)
+    for _ in range(2):
+        with connection.get_read_db_session() as session:
+            session.execute(text('SELECT 1'))
+    assert waits == [lsn]
@@ -0,0 +1,33 @@
+# Copyright (c) 2024 AlgebraAI All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from metadata.core.config_cache import config_generation
+from metadata.core.domain.event import AtomicParameter
+from metadata.core.domain.schema import ParameterType
+from metadata.core.system_catalog import get_system_catalog
+
+
+def test_catalog_is_reloaded_only_after_config_change(session_factory):
+    catalog = get_system_catalog(session_factory)
+    assert catalog.atomic_parameters
+    assert {c.embedded_in_event for c in catalog.embedded_event_contexts} <= {True}
+    assert {c.embedded_in_event for c in catalog.non_embedded_event_contexts} <= {False}
+
+    with session_factory() as session:
+        session.add(AtomicParameter(name='new_atomic', type=ParameterType.STRING))
+        session.commit()
+    assert get_system_catalog(session_factory) is catalog
+
+    config_generation.bump()
+    assert 'new_atomic' in get_system_catalog(session_factory).get_atomic_parameter_names()